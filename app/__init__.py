@@ -11,22 +11,41 @@ use run.py
 Revisions:
 01/02/2025 Add support for database and Flask shell
 02/06/2025 Updated to support German translations
+10/18/2026 Initialize the translation cache, client and background jobs
+10/18/2026 Register command line commands
+10/18/2026 Initialize the last seen tracker
+10/18/2026 Load users for the login manager from the principal cache
+10/18/2026 Initialize the fragment and page caches
+10/18/2026 Initialize the password hashing pool
+10/18/2026 Mail errors through the mail dispatcher as rate limited digests
+10/18/2026 Log through a queue listener, as JSON with request details
+10/18/2026 Initialize the request metrics
+10/18/2026 Initialize the new post jobs
+10/18/2026 Register the flask db commands without importing Alembic
 """
 
 
-import logging
-import os
 from datetime import timedelta
 from flask import Flask, request
 from flask_babel import lazy_gettext as _l
-from flask_mail import Mail, Message
-from logging.handlers import SMTPHandler, RotatingFileHandler
+from .activity import last_seen_tracker
+from .auth import principal_cache
+from .cache import fragment_cache
+from .cli import cli
 from .config import Config
+from .email import mail_dispatcher
 from . import errors
-from .extensions import db, login_manager, mail, migrate, moment, babel
+from .extensions import db, login_manager, mail, migrate_commands, moment, babel
 from .forms import SearchForm
-from .models import User, Post
+from .fragments import render_post
+from .http_cache import init_page_cache
+from .log import init_logging
+from .metrics import request_metrics
+from .models import User, Post, Translation
+from .jobs import post_jobs, translation_jobs
+from .passwords import password_hasher
 from .routes import pages
+from .trans import translation_cache, translation_client
 
 
 def create_app():
@@ -46,9 +65,20 @@ def create_app():
     babel.init_app(app, locale_selector=get_locale)
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
     mail.init_app(app)
     moment.init_app(app)
+    translation_cache.init_app(app)
+    translation_client.init_app(app)
+    translation_jobs.init_app(app)
+    post_jobs.init_app(app)
+    last_seen_tracker.init_app(app)
+    principal_cache.init_app(app)
+    password_hasher.init_app(app)
+    mail_dispatcher.init_app(app)
+    request_metrics.init_app(app)
+    fragment_cache.init_app(app)
+    app.add_template_global(render_post)
+    init_page_cache(app)
     
     # Set view to login route 
     login_manager.login_view = 'pages.login'
@@ -58,7 +88,7 @@ def create_app():
     # Get user by id for login manager
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return principal_cache.load(int(user_id))
     
     # Context processor registration
     @app.context_processor 
@@ -69,6 +99,8 @@ def create_app():
 
     # Register blueprints
     app.register_blueprint(pages)
+    app.register_blueprint(cli)
+    app.cli.add_command(migrate_commands)
 
     # Error handlers
     app.register_error_handler(403, errors.forbidden)
@@ -78,56 +110,13 @@ def create_app():
     # Add shell context
     @app.shell_context_processor
     def make_shell_context():
-        return {'db': db, 'User': User, 'Post': Post}
+        return {'db': db, 'User': User, 'Post': Post,
+                'Translation': Translation}
     
-    # Set up logging abd email error notification
-    # mail = Mail(app)
-
-    # Create Email Logging Handler
-    class SendGridHandler(logging.Handler):
-        def emit(self, record):
-            try:
-                msg = Message(
-                    subject='Flash Journal Failure',
-                    body=self.format(record),  
-                    recipients=app.config['ADMIN']
-                )
-                mail.send(msg)
-            except Exception:
-                self.handleError(record)   
-
-    # Configure the logger mail and file handlers
-    if not app.debug:  
-        # Same log format for both email and file
-        MESSAGE_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-
-        app.logger.setLevel(logging.INFO)
-
-        mail_handler = SendGridHandler()
-        mail_handler.setLevel(logging.ERROR) 
-        
-        # Formatter same for both email and 
-        formatter = logging.Formatter(
-            MESSAGE_FORMAT
-        )
-        mail_handler.setFormatter(formatter)
-        app.logger.addHandler(mail_handler)
-
-        # Create directory for log files
-        if not os.path.exists('logs'):
-            os.mkdir('logs')
-
-        # Configure log file handler
-        file_handler = RotatingFileHandler('logs/journal.log', maxBytes=10240,
-                                        backupCount=10)
-        file_handler.setFormatter(logging.Formatter(
-            MESSAGE_FORMAT
-            ))
-        file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)  
-
-        app.logger.setLevel(logging.INFO)
-        app.logger.info('Flask Journal startup')              
+    # Log to file and mail errors from a background listener
+    if not app.debug:
+        init_logging(app)
+        app.logger.info('Flask Journal startup')
 
 
     # Test the Logging:
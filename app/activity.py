@@ -0,0 +1,101 @@
+"""
+Program: Activity
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Tracks when users were last seen without a database write
+on every page view
+
+Revisions:
+10/18/2026 Start forked workers with an empty buffer and a new lock
+
+"""
+
+import atexit
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from threading import Lock
+from time import monotonic
+from app.extensions import db
+from app.models import User
+
+
+class LastSeenTracker:
+    """
+    Description: Keeps last seen times in memory and writes them in one
+    bulk UPDATE at most once per interval. Each user is written at most
+    once per interval by this process.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 60
+        self._pending = {}
+        self._written = {}
+        self._last_flush = monotonic()
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config['LAST_SEEN_INTERVAL']
+        atexit.register(self._flush_at_exit)
+
+    def touch(self, user_id):
+        """
+        Description: Record a page view of a user, flushing the recorded
+        times when the interval has passed
+        Param: user_id - Id of the user
+        """
+
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            written = self._written.get(user_id)
+            if written is None or (now - written).total_seconds() >= self.interval:
+                self._pending[user_id] = now
+            due = (self._pending and
+                   monotonic() - self._last_flush >= self.interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Description: Write all recorded times in one bulk UPDATE
+        Return: Number of users updated
+        """
+
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._last_flush = monotonic()
+            # Forget users whose interval has passed anyway
+            self._written = {
+                user_id: seen for user_id, seen in self._written.items()
+                if (now - seen).total_seconds() < self.interval}
+            self._written.update(pending)
+        if not pending:
+            return 0
+
+        try:
+            db.session.execute(
+                sa.update(User),
+                [{'id': user_id, 'last_seen': seen}
+                 for user_id, seen in pending.items()])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(pending)
+
+    def after_fork(self):
+        # Times buffered by the parent are written by the parent, and its
+        # lock may have been held by another thread at the fork
+        self._pending = {}
+        self._lock = Lock()
+
+    def _flush_at_exit(self):
+        with self.app.app_context():
+            self.flush()
+
+
+last_seen_tracker = LastSeenTracker()
@@ -0,0 +1,88 @@
+"""
+Program: Auth
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Compact logged in user for the login manager, cached between
+requests so authenticated pages do not load the whole user row
+
+Revisions:
+10/18/2026 Use the stored avatar digest
+
+"""
+
+import sqlalchemy as sa
+from flask_login import UserMixin
+from app.cache import LRUCache
+from app.extensions import db
+from app.models import User, avatar_url, email_digest
+
+
+class Principal(UserMixin):
+    """
+    Description: The fields of the logged in user that every request uses.
+    Any other attribute loads the full User row on first use.
+    """
+
+    def __init__(self, id, username, avatar_hash):
+        self.id = id
+        self.username = username
+        self.avatar_hash = avatar_hash
+        self._user = None
+
+    def __repr__(self):
+        return f'<Principal: {self.username}>'
+
+    def load(self):
+        # Full User row, for routes that change or follow the user
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def avatar(self, size):
+        return avatar_url(self.avatar_hash, size)
+
+
+class PrincipalCache:
+    """
+    Description: Short lived, size bounded cache of principal fields by
+    user id
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(1024, ttl=60)
+
+    def init_app(self, app):
+        self.cache.maxsize = app.config['PRINCIPAL_CACHE_SIZE']
+        self.cache.ttl = app.config['PRINCIPAL_CACHE_TTL']
+
+    def load(self, user_id):
+        """
+        Description: Get the principal of a user for the login manager
+        Param: user_id - Id of the user
+        Return: Principal, or None if there is no such user
+        """
+
+        fields = self.cache.get(user_id)
+        if fields is None:
+            row = db.session.execute(
+                sa.select(User.id, User.username, User.email, User.avatar_hash)
+                .where(User.id == user_id)).first()
+            if row is None:
+                return None
+            avatar_hash = row.avatar_hash or email_digest(row.email)
+            fields = (row.id, row.username, avatar_hash)
+            self.cache.set(user_id, fields)
+        return Principal(*fields)
+
+    def invalidate(self, user_id):
+        # Call when the profile or password of a user changes
+        self.cache.delete(user_id)
+
+
+principal_cache = PrincipalCache()
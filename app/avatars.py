@@ -0,0 +1,46 @@
+"""
+Program: Avatars
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Self hosted identicon avatars, so pages do not depend on a
+remote image host (AVATAR_MODE=local)
+
+Revisions:
+
+"""
+
+from app.cache import LRUCache
+
+identicon_cache = LRUCache(1024)
+
+
+def identicon_svg(digest, size):
+    """
+    Description: Draw a 5x5 mirrored identicon for an avatar digest
+    Param: digest - Hex digest of the email address
+    Param: size - Width and height in pixels
+    Return: SVG image as text
+    """
+
+    key = (digest, size)
+    svg = identicon_cache.get(key)
+    if svg is not None:
+        return svg
+
+    color = f'#{digest[-6:]}'
+    cell = size / 5
+    cells = []
+    # The left three columns come from the digest, mirrored to the right
+    for i in range(15):
+        if int(digest[i], 16) % 2 == 0:
+            row, column = divmod(i, 3)
+            for x in {column, 4 - column}:
+                cells.append(f'<rect x="{x * cell:g}" y="{row * cell:g}" '
+                             f'width="{cell:g}" height="{cell:g}"/>')
+    svg = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" '
+           f'height="{size}" viewBox="0 0 {size} {size}">'
+           f'<rect width="{size}" height="{size}" fill="#f0f0f0"/>'
+           f'<g fill="{color}">{"".join(cells)}</g></svg>')
+    identicon_cache.set(key, svg)
+    return svg
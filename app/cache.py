@@ -0,0 +1,197 @@
+"""
+Program: Cache
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: In-process caching helpers for microblog application
+
+Revisions:
+10/18/2026 Add optional time to live for entries
+10/18/2026 Add fragment cache with memory and file backends
+
+"""
+
+import json
+import os
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from time import monotonic
+
+
+class LRUCache:
+    """
+    Description: Thread safe, size bounded least recently used cache
+    Param: maxsize - Maximum number of entries kept before evicting
+    Param: ttl - Seconds an entry stays valid, None to keep it until evicted
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires = None
+        if self.ttl is not None:
+            expires = monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            # Drop the least recently used entries
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class MemoryBackend:
+    """
+    Description: Fragment cache backend in a per-process LRU dict
+    """
+
+    def __init__(self, maxsize):
+        self.cache = LRUCache(maxsize)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+
+class FileBackend:
+    """
+    Description: Fragment cache backend in a local directory, shared by
+    every worker process on the host. Least recently used files are
+    removed when there are more than maxsize.
+    """
+
+    def __init__(self, directory, maxsize):
+        self.directory = directory
+        self.maxsize = maxsize
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory,
+                            sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            # Mark as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(temp_path, path)
+        # Check the size every so often rather than on every write
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = sorted(os.scandir(self.directory),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:max(len(entries) - self.maxsize, 0)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class FragmentCache:
+    """
+    Description: Rendered HTML fragments by name. Each entry stores the
+    version of the data it was rendered from and is only served for that
+    version.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        backend = app.config['FRAGMENT_CACHE']
+        maxsize = app.config['FRAGMENT_CACHE_SIZE']
+        if backend == 'memory':
+            self.backend = MemoryBackend(maxsize)
+        elif backend == 'file':
+            directory = (app.config['FRAGMENT_CACHE_DIR'] or
+                         os.path.join(app.instance_path, 'fragments'))
+            self.backend = FileBackend(directory, maxsize)
+        else:
+            self.backend = None
+
+    def get(self, name, version):
+        if self.backend is None:
+            return None
+        value = self.backend.get(name)
+        if value is None or value[0] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value[1]
+
+    def set(self, name, version, html):
+        if self.backend is not None:
+            self.backend.set(name, [version, str(html)])
+
+    def delete(self, name):
+        if self.backend is not None:
+            self.backend.delete(name)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+fragment_cache = FragmentCache()
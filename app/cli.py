@@ -0,0 +1,245 @@
+"""
+Program: CLI
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Flask command line commands for microblog application
+
+Revisions:
+10/18/2026 Add user and entry import and export commands
+10/18/2026 Add command to process entries waiting for their language
+10/18/2026 Add index creation and query plan check commands
+10/18/2026 Add import time report command
+10/18/2026 Note that migrations skip the lower(username) index
+
+"""
+
+import click
+import os
+import sqlalchemy as sa
+from flask import Blueprint, current_app
+from app.extensions import db
+from app.jobs import process_post
+from app.models import Post, User
+from app.query_plans import check_query_plans
+from app.search import create_search_index
+from app.startup import by_package, import_times, lazy_modules_loaded
+from app.transfer import (Checkpoint, export_posts, export_users,
+                          file_format, import_posts, import_records,
+                          insert_users)
+
+cli = Blueprint('cli', __name__, cli_group=None)
+
+
+@cli.cli.group()
+def counters():
+    """Follower counter commands."""
+    pass
+
+
+@counters.command()
+def repair():
+    """Recount follower and following counters for every user."""
+    repaired = User.repair_follow_counts()
+    db.session.commit()
+    click.echo(f'Repaired counters of {repaired} users')
+
+
+@cli.cli.group()
+def timeline():
+    """Materialized timeline commands."""
+    pass
+
+
+@timeline.command()
+def rebuild():
+    """Rebuild the timeline table, run before switching TIMELINE_MODE to fanout."""
+    rows = Post.rebuild_timelines()
+    db.session.commit()
+    click.echo(f'Rebuilt timelines with {rows} entries')
+
+
+@cli.cli.group()
+def search():
+    """Full-text search commands."""
+    pass
+
+
+@search.command()
+def reindex():
+    """Create the full-text index of an existing database and fill it."""
+    dialect = create_search_index()
+    click.echo(f'Search index rebuilt for {dialect}')
+
+
+@cli.cli.group()
+def avatars():
+    """Avatar commands."""
+    pass
+
+
+@avatars.command()
+def backfill():
+    """Store the avatar digest of users that do not have one yet."""
+    total = User.backfill_avatar_hashes()
+    click.echo(f'Stored avatar digests of {total} users')
+
+
+@cli.cli.group()
+def schema():
+    """Index and query plan commands."""
+    pass
+
+
+@schema.command()
+def indexes():
+    """Create the indexes of the models missing from an existing database."""
+    # IF NOT EXISTS, reflection does not see expression indexes, so
+    # flask db migrate leaves out ix_user_username_lower on SQLite
+    indexes = [index for table in db.metadata.sorted_tables
+               for index in table.indexes]
+    for index in indexes:
+        db.session.execute(sa.schema.CreateIndex(index, if_not_exists=True))
+    # Replaced by ix_post_user_id_timestamp
+    db.session.execute(sa.schema.DropIndex(
+        sa.Index('ix_post_user_id', Post.__table__.c.user_id), if_exists=True))
+    db.session.commit()
+    click.echo(f'Checked {len(indexes)} indexes')
+
+
+@schema.command()
+@click.option('--verbose', is_flag=True, help='Show every statement and plan.')
+def explain(verbose):
+    """Fail if any query of the main pages scans a whole table."""
+    try:
+        results = check_query_plans()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    failed = 0
+    for result in results:
+        if result['full_scans']:
+            failed += 1
+        if verbose or result['full_scans']:
+            click.echo(f"{result['page']}: {' '.join(result['statement'].split())}")
+            for line in result['plan']:
+                click.echo(f'    {line}')
+            if result['full_scans']:
+                click.echo(f"    FULL SCAN of {', '.join(result['full_scans'])}")
+    click.echo(f'Checked {len(results)} queries, {failed} with full scans')
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.cli.group()
+def startup():
+    """Startup time commands."""
+    pass
+
+
+@startup.command()
+@click.option('--top', default=15, show_default=True,
+              help='Number of packages and modules shown.')
+def imports(top):
+    """Show what importing the app package spends its time on."""
+    try:
+        times = import_times(cwd=os.path.dirname(current_app.root_path))
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    total = sum(own for module, own, cumulative in times)
+    click.echo(f'Imported {len(times)} modules in {total / 1000:.1f} ms')
+    click.echo('Packages by own import time:')
+    for package, own in by_package(times)[:top]:
+        click.echo(f'    {own / 1000:8.1f} ms  {package}')
+    click.echo('Modules by cumulative import time:')
+    slowest = sorted(times, key=lambda time: time[2], reverse=True)
+    for module, own, cumulative in slowest[:top]:
+        click.echo(f'    {cumulative / 1000:8.1f} ms  {module}')
+    loaded = lazy_modules_loaded(times)
+    if loaded:
+        click.echo(f"Imported at startup, should be lazy: {', '.join(loaded)}")
+
+
+def checkpoint_of(path, restart):
+    # Checkpoint file kept next to the imported file
+    checkpoint = Checkpoint(f'{path}.checkpoint', path)
+    if restart:
+        checkpoint.clear()
+    elif checkpoint.load():
+        click.echo(f'Continuing after {checkpoint.load()} records')
+    return checkpoint
+
+
+@cli.cli.group()
+def users():
+    """User import and export commands."""
+    pass
+
+
+@users.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', type=click.Choice(['ndjson', 'csv']),
+              help='File format, by default from the file extension.')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint and start over.')
+def import_users_command(path, format, batch_size, restart):
+    """Import users from an NDJSON or CSV file."""
+    done, inserted = import_records(
+        path, file_format(path, format), batch_size,
+        checkpoint_of(path, restart), insert_users)
+    click.echo(f'Read {done} users, imported {inserted}')
+
+
+@users.command('export')
+@click.argument('path', type=click.Path(dir_okay=False))
+@click.option('--format', type=click.Choice(['ndjson', 'csv']),
+              help='File format, by default from the file extension.')
+@click.option('--batch-size', default=1000, show_default=True)
+def export_users_command(path, format, batch_size):
+    """Export users, with their password hashes, to an NDJSON or CSV file."""
+    total = export_users(path, file_format(path, format), batch_size)
+    click.echo(f'Exported {total} users')
+
+
+@cli.cli.group()
+def posts():
+    """Journal entry import and export commands."""
+    pass
+
+
+@posts.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', type=click.Choice(['ndjson', 'csv']),
+              help='File format, by default from the file extension.')
+@click.option('--batch-size', default=500, show_default=True)
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True,
+              help='Processes sanitizing and detecting languages, 0 for none.')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint and start over.')
+def import_posts_command(path, format, batch_size, workers, restart):
+    """Import entries from an NDJSON or CSV file, authors by username."""
+    done, inserted, skipped = import_posts(
+        path, file_format(path, format), batch_size,
+        checkpoint_of(path, restart), workers,
+        progress=lambda done: click.echo(f'{done} records done'))
+    click.echo(f'Read {done} entries, imported {inserted}, '
+               f'skipped {skipped} of unknown authors')
+
+
+@posts.command()
+def detect():
+    """Process entries still waiting for their language, e.g. after a crash."""
+    post_ids = db.session.scalars(
+        sa.select(Post.id).where(Post.language.is_(None))).all()
+    for post_id in post_ids:
+        process_post(post_id)
+    click.echo(f'Processed {len(post_ids)} entries')
+
+
+@posts.command('export')
+@click.argument('path', type=click.Path(dir_okay=False))
+@click.option('--format', type=click.Choice(['ndjson', 'csv']),
+              help='File format, by default from the file extension.')
+@click.option('--batch-size', default=1000, show_default=True)
+def export_posts_command(path, format, batch_size):
+    """Export entries to an NDJSON or CSV file."""
+    total = export_posts(path, file_format(path, format), batch_size)
+    click.echo(f'Exported {total} entries')
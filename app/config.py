@@ -30,10 +30,88 @@ class Config:
     MAIL_DEFAULT_SENDER=os.environ.get('MAIL_DEFAULT_SENDER')
     ADMIN = os.environ.get('MAIL_ADMIN')
 
+    # Outgoing mail queue, messages sent per connection batch, seconds an
+    # idle connection is kept open, and seconds between error digests
+    MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE') or 100)
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE') or 20)
+    MAIL_IDLE_TIMEOUT = int(os.environ.get('MAIL_IDLE_TIMEOUT') or 30)
+    MAIL_RETRIES = int(os.environ.get('MAIL_RETRIES') or 3)
+    MAIL_ERROR_INTERVAL = int(os.environ.get('MAIL_ERROR_INTERVAL') or 300)
+
+    # Log file rotated at LOG_MAX_BYTES, LOG_FORMAT is 'json' or 'text'
+    LOG_FILE = os.environ.get('LOG_FILE') or os.path.join('logs', 'journal.log')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES') or 10 * 1024 * 1024)
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT') or 10)
+    LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'json'
+
+    # Send Server-Timing headers, and log requests slower than
+    # METRICS_SLOW_REQUEST_MS with their SQL (0 to not log them)
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'on') != 'off'
+    METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS') or 0)
+
     POSTS_PER_PAGE = 3
 
+    # Seconds between writes of the users' last seen times
+    LAST_SEEN_INTERVAL = int(os.environ.get('LAST_SEEN_INTERVAL') or 60)
+
+    # Avatar images, 'gravatar' or self hosted 'local' identicons
+    AVATAR_MODE = os.environ.get('AVATAR_MODE') or 'gravatar'
+
+    # Rendered entries and profiles, 'memory', 'file' or 'none'
+    FRAGMENT_CACHE = os.environ.get('FRAGMENT_CACHE') or 'memory'
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE') or 1024)
+    FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR')
+
+    # Anonymous pages kept rendered, 0 to only answer conditional GETs
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE') or 256)
+
+    # werkzeug hash method and parameters, e.g. 'scrypt:32768:8:1' or
+    # 'pbkdf2:sha256:600000', and the processes that compute the hashes
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT') or 30)
+
+    # Logged in users kept between requests, and for how many seconds
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE') or 1024)
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL') or 60)
+
+    # Listing pagination, 'keyset' cursors or 'offset' page numbers
+    PAGINATION_MODE = os.environ.get('PAGINATION_MODE') or 'keyset'
+
+    # User timeline source, 'query' joins the followers table on every read
+    # and 'fanout' reads the timeline table filled when entries are added
+    TIMELINE_MODE = os.environ.get('TIMELINE_MODE') or 'query'
+
     LANGUAGES = ['en', 'de']
 
+    # Number of translated posts kept in memory in front of the database
+    TRANSLATION_CACHE_SIZE = int(os.environ.get('TRANSLATION_CACHE_SIZE') or 512)
+
+    # Translation service, 'google' or the offline 'stub'
+    TRANSLATOR_BACKEND = os.environ.get('TRANSLATOR_BACKEND') or 'google'
+
+    # Seconds to wait for a translation and concurrent upstream requests
+    TRANSLATION_TIMEOUT = float(os.environ.get('TRANSLATION_TIMEOUT') or 10)
+    TRANSLATION_CONCURRENCY = int(os.environ.get('TRANSLATION_CONCURRENCY') or 4)
+
+    # Batched translation of several posts at once, and the most posts
+    # one trans_many request may ask for
+    TRANSLATION_BATCH_CHARS = int(os.environ.get('TRANSLATION_BATCH_CHARS') or 4500)
+    TRANSLATE_MANY_MAX = int(os.environ.get('TRANSLATE_MANY_MAX') or 20)
+
+    # Background translation of new entries (0 workers disables it)
+    TRANSLATION_WORKERS = int(os.environ.get('TRANSLATION_WORKERS') or 2)
+    TRANSLATION_QUEUE_SIZE = int(os.environ.get('TRANSLATION_QUEUE_SIZE') or 100)
+    TRANSLATION_RETRIES = int(os.environ.get('TRANSLATION_RETRIES') or 3)
+    TRANSLATION_BACKOFF = float(os.environ.get('TRANSLATION_BACKOFF') or 1.0)
+
+    # Language detection and timelines of new entries, done in the
+    # background (0 workers does it in the request)
+    POST_WORKERS = int(os.environ.get('POST_WORKERS') or 1)
+    POST_QUEUE_SIZE = int(os.environ.get('POST_QUEUE_SIZE') or 1000)
+    POST_RETRIES = int(os.environ.get('POST_RETRIES') or 3)
+    POST_BACKOFF = float(os.environ.get('POST_BACKOFF') or 1.0)
+
     # Allowed elements for sanitized the entry input
     ALLOWED_TAGS = ['p', 'br', 'code', 'strong', 'em', 'ul', 'ol', 'li']
     ALLOWED_ATTRIBUTES = {}
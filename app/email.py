@@ -2,29 +2,259 @@
 Program: Email
 Author: Maya Name
 Creation Date: 01/28/202
-Revision Date: 
+Revision Date: 10/18/2026
 Description: Email wrapper function for Flask microblog application
 
 Revisions:
+10/18/2026 Send mail from one queued dispatcher over a persistent connection
+10/18/2026 Add rate limited error digest log handler
+10/18/2026 Start a new sender and connection in forked workers
+10/18/2026 Retry only dropped connections, close them before reconnecting
 
 """
 
+import logging
+import smtplib
+import socket
+import time
+from queue import Empty, Full, Queue
+from threading import Lock, Thread, Timer
+from time import monotonic
 from flask import render_template, current_app
 from flask_mail import Message
 from app.config import Config
 from app.extensions import mail
-from threading import Thread
 
-def send_async_email(app, msg):
-    with app.app_context():
-        mail.send(msg)
+# Lost connections, worth reconnecting for. Every other SMTPException,
+# such as refused recipients, fails the same way again.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError,
+                    socket.timeout)
+
+
+class MailDispatcher:
+    """
+    Description: Bounded queue and a single sender thread that keeps one
+    SMTP connection open while there is mail to send, reconnecting when
+    the server drops it
+    """
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = 20
+        self.idle_timeout = 30
+        self.retries = 3
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = Queue()
+        self._thread = None
+        self._connection = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config['MAIL_BATCH_SIZE']
+        self.idle_timeout = app.config['MAIL_IDLE_TIMEOUT']
+        self.retries = app.config['MAIL_RETRIES']
+        self._queue = Queue(maxsize=app.config['MAIL_QUEUE_SIZE'])
+
+    def submit(self, msg):
+        """
+        Description: Queue a message without waiting for it to be sent
+        Param: msg - flask_mail Message
+        Return: True if queued, False if the queue is full
+        """
+
+        self._start()
+        try:
+            self._queue.put_nowait(msg)
+        except Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def join(self):
+        # Wait until every queued message has been handled
+        self._queue.join()
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'backlog': self._queue.qsize(),
+        }
+
+    def after_fork(self):
+        # The sender thread is not copied by fork and the SMTP socket
+        # belongs to the parent, so the worker opens its own
+        self._queue = Queue(maxsize=self._queue.maxsize)
+        self._thread = None
+        self._connection = None
+        self._lock = Lock()
+
+    def _start(self):
+        # The sender is started on first use rather than at app creation
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._work, daemon=True,
+                                      name='mail-dispatcher')
+                self._thread.start()
+
+    def _take(self, timeout):
+        # Next batch of messages, empty if none arrived within the timeout
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._take(None)
+            with self.app.app_context():
+                # Keep the connection while mail keeps arriving
+                while batch:
+                    for msg in batch:
+                        try:
+                            self._send(msg)
+                        finally:
+                            self._queue.task_done()
+                    batch = self._take(self.idle_timeout)
+                self._close()
+
+    def _send(self, msg):
+        for attempt in range(self.retries + 1):
+            try:
+                if self._connection is None:
+                    if attempt:
+                        time.sleep(attempt)
+                    connection = mail.connect()
+                    connection.__enter__()
+                    self._connection = connection
+                self._connection.send(msg)
+                self.sent += 1
+                return
+            except RECONNECT_ERRORS as e:
+                # Reconnect and try again
+                self._close()
+                error = e
+            except Exception as e:
+                # Refused recipients and the like will not improve
+                error = e
+                break
+        self.failed += 1
+        self.app.logger.warning(f'Mail to {msg.recipients} failed: {error}')
+
+    def _close(self):
+        if self._connection is not None:
+            host = self._connection.host
+            try:
+                self._connection.__exit__(None, None, None)
+            except (smtplib.SMTPException, OSError):
+                pass
+            finally:
+                # quit() leaves the socket open when the server is gone
+                if host is not None:
+                    host.close()
+            self._connection = None
+
+
+mail_dispatcher = MailDispatcher()
+
+
+class DigestMailHandler(logging.Handler):
+    """
+    Description: Log handler that mails error records to the admins
+    without blocking the request. At most one mail is queued per
+    interval, repeated errors are counted and sent together as a digest.
+    """
+
+    def __init__(self, app, recipients, interval=300, subject='Flask Journal Failure'):
+        super().__init__()
+        self.app = app
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        self.recipients = recipients or []
+        self.interval = interval
+        self.subject = subject
+        self._pending = {}
+        self._last_sent = None
+        self._timer = None
+        self._digest_lock = Lock()
+
+    def emit(self, record):
+        try:
+            text = self.format(record)
+            # Same message from the same line counts as a repeat
+            key = (record.pathname, record.lineno, record.msg)
+            with self._digest_lock:
+                entry = self._pending.setdefault(key, [text, 0])
+                entry[1] += 1
+                wait = 0
+                if self._last_sent is not None:
+                    wait = self._last_sent + self.interval - monotonic()
+                if wait > 0 and self._timer is None:
+                    self._timer = Timer(wait, self.send_digest)
+                    self._timer.daemon = True
+                    self._timer.start()
+            if wait <= 0:
+                self.send_digest()
+        except Exception:
+            self.handleError(record)
+
+    def send_digest(self):
+        with self._digest_lock:
+            pending = self._pending
+            self._pending = {}
+            self._timer = None
+            if not pending:
+                return
+            self._last_sent = monotonic()
+
+        total = sum(count for text, count in pending.values())
+        if total == 1:
+            subject = self.subject
+        else:
+            subject = f'{self.subject} ({total} errors)'
+        parts = []
+        for text, count in pending.values():
+            if count > 1:
+                text = f'{count} times, first:\n{text}'
+            parts.append(text)
+        with self.app.app_context():
+            msg = Message(subject=subject, recipients=self.recipients,
+                          body='\n\n'.join(parts))
+        mail_dispatcher.submit(msg)
+
+    def after_fork(self):
+        # A digest timer of the parent never fires in the worker
+        self._pending = {}
+        self._timer = None
+        self._digest_lock = Lock()
+
+    def close(self):
+        # Send what is left before the process ends
+        if self._timer is not None:
+            self._timer.cancel()
+        self.send_digest()
+        super().close()
+
 
 def send_email(subject, sender, recipients, text_body, html_body):
     msg = Message(subject, sender=sender, recipients=recipients)
     msg.body = text_body
     msg.html = html_body
-    app = current_app._get_current_object()
-    Thread(target=send_async_email, args=(app, msg)).start()
+    if not mail_dispatcher.submit(msg):
+        current_app.logger.warning(f'Mail queue full, mail to {recipients} dropped')
 
 def send_password_reset_email(user):
     token = user.get_reset_password_token()
@@ -34,4 +264,4 @@ def send_password_reset_email(user):
                text_body=render_template('email/reset_password.txt',
                                          user=user, token=token),
                html_body=render_template('email/reset_password.html',
-                                         user=user, token=token))
\ No newline at end of file
+                                         user=user, token=token))
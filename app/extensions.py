@@ -2,27 +2,80 @@
 Program: Extensions
 Author: Maya Name
 Creation Date: 01/01/2025
-Revision Date: 
+Revision Date: 10/18/2026
 Description: Extensions file for microblog application
 
 Revisions:
-
+10/18/2026 Build the translator and load Flask-Migrate on first use
+10/18/2026 Build a new translator in forked workers
+10/18/2026 Leave the search index out of autogenerated migrations
 
 """
 
+import click
+from threading import Lock
+from flask.cli import ScriptInfo
 from flask_babel import Babel
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail
 from flask_moment import Moment
-from googletrans import Translator
 
 
 babel = Babel()
 db = SQLAlchemy()
 login_manager = LoginManager()
-migrate = Migrate()
 mail = Mail()
 moment = Moment()
-translator = Translator()
+
+# googletrans pulls in httpx and h2, so the translator is built when the
+# first translation is requested
+_translator = None
+_translator_lock = Lock()
+
+
+def get_translator():
+    """
+    Description: Shared Google Translate client, built on first use
+    Return: googletrans Translator
+    """
+
+    global _translator
+    with _translator_lock:
+        if _translator is None:
+            from googletrans import Translator
+            _translator = Translator()
+    return _translator
+
+
+def reset_translator():
+    # A forked worker builds its own client rather than share the
+    # connections of the parent
+    global _translator, _translator_lock
+    _translator = None
+    _translator_lock = Lock()
+
+
+class MigrateCommands(click.Group):
+    """
+    Description: Stands in for the flask db commands of Flask-Migrate, so
+    Alembic is only imported when one of them is run
+    """
+
+    def _commands(self, ctx):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as commands
+        from app.search import include_object
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db, include_object=include_object)
+        return commands
+
+    def list_commands(self, ctx):
+        return self._commands(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands(ctx).get_command(ctx, name)
+
+
+migrate_commands = MigrateCommands('db', help='Perform database migrations.')
@@ -7,10 +7,13 @@ Description: Forms file for microblog application
 
 Revisions:
 02/03/2025 Update text to support German translation
+10/18/2026 Submit the search form with GET so results can be paginated
+10/18/2026 Check for taken usernames regardless of case
 
 """
 
 import sqlalchemy as sa
+from flask import request
 from flask_babel import lazy_gettext as _l
 from flask_wtf import FlaskForm
 from wtforms import BooleanField, PasswordField, StringField, SubmitField, TextAreaField
@@ -38,7 +41,7 @@ class SignupForm(FlaskForm):
 
     def validate_username(self, username):
         user = db.session.scalar(sa.select(User).where(
-            User.username == username.data))
+            User.username_taken(username.data)))
         if user is not None:
             raise ValidationError(_l('Please use a different username.'))
 
@@ -81,4 +84,12 @@ class ResetPasswordForm(FlaskForm):
 
 class SearchForm(FlaskForm):
     searched = StringField("Searched", validators=[InputRequired()])
-    submit = SubmitField("Submit")
\ No newline at end of file
+    submit = SubmitField("Submit")
+
+    # Read the query string, no CSRF token needed for a GET search
+    def __init__(self, *args, **kwargs):
+        if 'formdata' not in kwargs:
+            kwargs['formdata'] = request.args
+        if 'meta' not in kwargs:
+            kwargs['meta'] = {'csrf': False}
+        super(SearchForm, self).__init__(*args, **kwargs)
\ No newline at end of file
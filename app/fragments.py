@@ -0,0 +1,68 @@
+"""
+Program: Fragments
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Cached rendering of journal entries and author profiles
+
+Revisions:
+10/18/2026 Render entries again once their language is known
+
+"""
+
+from flask import current_app, g, render_template
+from hashlib import sha1
+from markupsafe import Markup
+from app.cache import fragment_cache
+
+
+def render_post(post):
+    """
+    Description: Render _post.html for a post, from the fragment cache
+    when the post has not changed
+    Param: post - Post to be rendered
+    Return: Rendered HTML
+    """
+
+    name = f'post:{post.id}:{g.locale}'
+    # The language is filled in after the post is added
+    version = f'{post.content_hash()}:{post.language}'
+    html = fragment_cache.get(name, version)
+    if html is None:
+        html = render_template('_post.html', post=post)
+        fragment_cache.set(name, version, html)
+    return Markup(html)
+
+
+def profile_version(user):
+    # Changes with the follower counters and any field the profile shows
+    fields = (user.followers_total, user.following_total, user.last_seen,
+              user.firstname, user.lastname, user.about_me, user.avatar_hash)
+    return sha1(repr(fields).encode('utf-8')).hexdigest()
+
+
+def render_profile(user):
+    """
+    Description: Render _profile_content.html for an author, from the
+    fragment cache when the profile has not changed
+    Param: user - User to be rendered
+    Return: Rendered HTML
+    """
+
+    name = f'profile:{user.username}:{g.locale}'
+    version = profile_version(user)
+    html = fragment_cache.get(name, version)
+    if html is None:
+        html = render_template('_profile_content.html', user=user)
+        fragment_cache.set(name, version, html)
+    return Markup(html)
+
+
+def invalidate_post(post_id):
+    for locale in current_app.config['LANGUAGES']:
+        fragment_cache.delete(f'post:{post_id}:{locale}')
+
+
+def invalidate_profile(username):
+    for locale in current_app.config['LANGUAGES']:
+        fragment_cache.delete(f'profile:{username}:{locale}')
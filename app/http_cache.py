@@ -0,0 +1,114 @@
+"""
+Program: HTTP Cache
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Conditional GET (ETag) and server-side page
+cache for pages that look the same to every anonymous visitor
+
+Revisions:
+10/18/2026 Include the language of the newest post in listing versions
+10/18/2026 Look up the listing version with index friendly subqueries
+10/18/2026 Validate with the ETag only, drop Last-Modified
+
+"""
+
+import sqlalchemy as sa
+from functools import wraps
+from hashlib import sha1
+from time import time
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from app.cache import LRUCache
+from app.extensions import db
+from app.fragments import profile_version
+from app.models import Post, User
+
+# Pages rendered by an older deploy are never treated as current
+BOOT_ID = str(time())
+
+page_cache = LRUCache(256)
+
+
+def init_page_cache(app):
+    page_cache.maxsize = app.config['PAGE_CACHE_SIZE']
+
+
+def is_anonymous_view():
+    # Logged in users and pending flash messages change the page
+    return (request.method == 'GET' and
+            not current_user.is_authenticated and
+            '_flashes' not in session)
+
+
+def latest_post_version(*args, **kwargs):
+    # The newest post changes every listing page, and so does filling in
+    # its language in the background. One aggregate per subquery, so
+    # each is answered from an index
+    newest = sa.select(sa.func.max(Post.timestamp)).scalar_subquery()
+    last_id = sa.select(sa.func.max(Post.id)).scalar_subquery()
+    language = (sa.select(Post.language)
+                .where(Post.id == last_id).scalar_subquery())
+    newest, last_id, last_language = db.session.execute(
+        sa.select(newest, last_id, language)).one()
+    return f'{newest}:{last_id}:{last_language}'
+
+
+def user_version(username, *args, **kwargs):
+    user = db.session.scalar(sa.select(User).where(User.username == username))
+    if user is None:
+        return None
+    return profile_version(user)
+
+
+def static_version(*args, **kwargs):
+    return ''
+
+
+def conditional_page(version_source):
+    """
+    Description: Decorator for anonymous pages. Answers 304 Not Modified
+    when the ETag of the browser is still current, and serves unchanged
+    pages from the page cache without rendering them. There is no
+    Last-Modified, the newest post does not date pages that also change
+    with profiles, translations and deploys.
+    Param: version_source - Function of the view arguments returning the
+    data version, None to skip caching
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not is_anonymous_view():
+                return view(*args, **kwargs)
+
+            version = version_source(*args, **kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+
+            key = f'{request.full_path}:{g.locale}'
+            etag = sha1(f'{BOOT_ID}:{version}:{key}'.encode('utf-8')).hexdigest()
+
+            # Answer from the validators without rendering
+            response = current_app.response_class()
+            response.set_etag(etag)
+            response.vary.update(('Accept-Language', 'Cookie'))
+            response.cache_control.no_cache = True
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+            cached = page_cache.get(key)
+            if cached is not None and cached[0] == etag:
+                response.set_data(cached[1])
+                return response
+
+            rendered = make_response(view(*args, **kwargs))
+            if rendered.status_code != 200:
+                return rendered
+            page_cache.set(key, (etag, rendered.get_data()))
+            response.set_data(rendered.get_data())
+            response.mimetype = rendered.mimetype
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,196 @@
+"""
+Program: Jobs
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Background job queues for microblog application
+
+Revisions:
+10/18/2026 Share the queue between translation and new post jobs
+10/18/2026 Detect the language of new posts in the background
+10/18/2026 Start new workers in forked processes
+10/18/2026 Declare the job of a queue as an abstract method
+
+"""
+
+import time
+from abc import ABC, abstractmethod
+from queue import Full, Queue
+from threading import Lock, Thread
+from app.extensions import db
+from app.fragments import invalidate_post
+from app.models import Post
+from app.text import detect_language, warm_detector
+from app.trans import pretranslate_post
+
+
+class JobQueue(ABC):
+    """
+    Description: Bounded queue and worker pool that runs a job for each
+    queued post id, retrying failures with exponential backoff. Settings
+    are read from <prefix>_WORKERS, _QUEUE_SIZE, _RETRIES and _BACKOFF.
+    """
+
+    name = 'jobs'
+    prefix = None
+
+    def __init__(self):
+        self.app = None
+        self.workers = 0
+        self.retries = 0
+        self.backoff = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = Queue()
+        self._threads = []
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config[f'{self.prefix}_WORKERS']
+        self.retries = app.config[f'{self.prefix}_RETRIES']
+        self.backoff = app.config[f'{self.prefix}_BACKOFF']
+        self._queue = Queue(maxsize=app.config[f'{self.prefix}_QUEUE_SIZE'])
+
+    def submit(self, post_id):
+        """
+        Description: Queue a post for the job
+        Param: post_id - Id of the post
+        Return: True if queued, False if disabled or the backlog is full
+        """
+
+        if not self.workers:
+            return False
+        self._start()
+        try:
+            self._queue.put_nowait(post_id)
+        except Full:
+            self.dropped += 1
+            self.app.logger.warning(f'{self.name} backlog full, post {post_id} dropped')
+            return False
+        self.submitted += 1
+        return True
+
+    def join(self):
+        # Wait until every queued post has been handled
+        self._queue.join()
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'backlog': self._queue.qsize(),
+        }
+
+    def after_fork(self):
+        # Threads are not copied by fork, the worker process starts its own
+        self._queue = Queue(maxsize=self._queue.maxsize)
+        self._threads = []
+        self._lock = Lock()
+
+    def setup(self):
+        # Run once by each worker thread before its first job
+        pass
+
+    @abstractmethod
+    def process(self, post_id):
+        # Job run for each queued post id, in an app context
+        pass
+
+    def _start(self):
+        # Workers are started on first use rather than at app creation
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = Thread(target=self._work, daemon=True,
+                                name=f'{self.name}-worker-{i}')
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        self.setup()
+        while True:
+            post_id = self._queue.get()
+            try:
+                self._run(post_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, post_id):
+        # Retry failed jobs with exponential backoff
+        for attempt in range(self.retries + 1):
+            try:
+                with self.app.app_context():
+                    self.process(post_id)
+                self.completed += 1
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self.failed += 1
+                    self.app.logger.warning(f'{self.name} of post {post_id} failed: {e}')
+                    return
+                time.sleep(self.backoff * 2 ** attempt)
+
+
+class TranslationJobs(JobQueue):
+    """
+    Description: Translates new posts into every configured language in
+    the background. When the backlog is full readers translate the post
+    on demand instead.
+    """
+
+    name = 'translation'
+    prefix = 'TRANSLATION'
+
+    def process(self, post_id):
+        post = db.session.get(Post, post_id)
+        if post is not None:
+            pretranslate_post(post)
+
+
+translation_jobs = TranslationJobs()
+
+
+def process_post(post_id):
+    """
+    Description: Finish a newly added post: detect its language, add it
+    to the timelines and queue its translations
+    Param: post_id - Id of the post
+    """
+
+    post = db.session.get(Post, post_id)
+    # Posts without a language are still waiting to be processed
+    if post is None or post.language is not None:
+        return
+    post.language = detect_language(post.body)
+    post.add_to_timelines()
+    db.session.commit()
+    invalidate_post(post.id)
+
+    # Translate the new entry before the first reader asks for it
+    if post.language:
+        translation_jobs.submit(post.id)
+
+
+class PostJobs(JobQueue):
+    """
+    Description: Processes new posts after add_entry has stored them
+    """
+
+    name = 'post'
+    prefix = 'POST'
+
+    def setup(self):
+        # Load the language profiles before the first post arrives
+        warm_detector()
+
+    def process(self, post_id):
+        process_post(post_id)
+
+
+post_jobs = PostJobs()
@@ -0,0 +1,175 @@
+"""
+Program: Log
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Logging for microblog application. Request threads only put
+records on a queue, a listener thread writes them to the log file and
+the mail handler.
+
+Revisions:
+10/18/2026 Take latency and query count from the request metrics
+10/18/2026 Restart the listener in forked workers
+
+"""
+
+import atexit
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
+from uuid import uuid4
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+from app.email import DigestMailHandler
+from app.metrics import request_metrics
+
+# Plain text format, used for mail and LOG_FORMAT=text
+MESSAGE_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+
+# Request details copied onto records that have them
+REQUEST_FIELDS = ('request_id', 'method', 'path', 'route', 'status',
+                  'latency_ms', 'queries')
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Description: Queue handler that adds the request id and route to each
+    record before it leaves the request thread
+    """
+
+    def prepare(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+            record.route = request.endpoint
+        # Render the message here, the arguments may not be safe to pass
+        # to another thread, but keep the traceback apart from it
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Description: One JSON object per line
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'location': f'{record.pathname}:{record.lineno}',
+        }
+        for field in REQUEST_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry)
+
+
+def start_request():
+    g.request_id = request.headers.get('X-Request-ID') or uuid4().hex
+    request_metrics.start()
+
+
+def log_request(response):
+    # One access record per request, static files excepted
+    timings = g.get('timings')
+    if timings is None or request.endpoint == 'static':
+        return response
+    logging.getLogger('journal.access').info(
+        '%s %s %s', request.method, request.path, response.status_code,
+        extra={'status': response.status_code,
+               'latency_ms': round(timings.elapsed * 1000, 2),
+               'queries': timings.queries})
+    response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def init_logging(app):
+    """
+    Description: Log to a rotating file and stderr and mail errors to the
+    admins, all from a listener thread so requests never wait on disk or
+    mail
+    Param: app - Flask application
+    Return: The started QueueListener
+    """
+
+    text_formatter = logging.Formatter(MESSAGE_FORMAT)
+
+    # Queued and rate limited, repeated errors are sent as a digest
+    mail_handler = DigestMailHandler(
+        app, app.config['ADMIN'],
+        interval=app.config['MAIL_ERROR_INTERVAL'])
+    mail_handler.setLevel(logging.ERROR)
+    mail_handler.setFormatter(text_formatter)
+
+    # Create directory for log files
+    log_dir = os.path.dirname(app.config['LOG_FILE'])
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingFileHandler(
+        app.config['LOG_FILE'],
+        maxBytes=app.config['LOG_MAX_BYTES'],
+        backupCount=app.config['LOG_BACKUP_COUNT'])
+    if app.config['LOG_FORMAT'] == 'json':
+        file_handler.setFormatter(JSONFormatter())
+    else:
+        file_handler.setFormatter(text_formatter)
+    file_handler.setLevel(logging.INFO)
+
+    # Flask's stderr handler, moved off the request thread
+    app.logger.removeHandler(default_handler)
+
+    queue = SimpleQueue()
+    listener = QueueListener(queue, file_handler, mail_handler,
+                             default_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    app.extensions['log_listener'] = listener
+
+    queue_handler = RequestQueueHandler(queue)
+    for logger in (app.logger, logging.getLogger('journal.access')):
+        logger.setLevel(logging.INFO)
+        logger.addHandler(queue_handler)
+
+    app.before_request(start_request)
+    app.after_request(log_request)
+    return listener
+
+
+def restart_logging(app):
+    """
+    Description: Start a listener in a forked worker, the thread of the
+    parent is not copied by fork. Records go on the inherited queue.
+    Param: app - Flask application
+    """
+
+    listener = app.extensions.get('log_listener')
+    if listener is None:
+        return
+    atexit.unregister(listener.stop)
+    for handler in listener.handlers:
+        if isinstance(handler, DigestMailHandler):
+            handler.after_fork()
+    listener = QueueListener(listener.queue, *listener.handlers,
+                             respect_handler_level=listener.respect_handler_level)
+    listener.start()
+    atexit.register(listener.stop)
+    app.extensions['log_listener'] = listener
@@ -0,0 +1,216 @@
+"""
+Program: Metrics
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Per-request timings of SQL, templates and translations, sent
+as a Server-Timing header and kept as histograms per endpoint
+
+Revisions:
+
+"""
+
+import sqlalchemy as sa
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from app.extensions import db
+
+# Histogram bucket upper bounds, seconds and statement counts
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Timings:
+    """
+    Description: Time spent by the current request, kept in g.timings
+    """
+
+    __slots__ = ('start', 'queries', 'sql', 'template', 'translation',
+                 'template_depth', 'template_start', 'statements')
+
+    def __init__(self, record_statements=False):
+        self.start = perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.translation = 0.0
+        self.template_depth = 0
+        self.template_start = 0.0
+        # Only kept when slow requests are logged
+        self.statements = [] if record_statements else None
+
+    @property
+    def elapsed(self):
+        return perf_counter() - self.start
+
+
+class Histogram:
+    """
+    Description: Prometheus style cumulative histogram by label value
+    """
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                # Bucket counts, then the sum of the values
+                series = self._series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def exposition(self):
+        lines = [f'# HELP {self.name} {self.description}',
+                 f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {label: list(values) for label, values in self._series.items()}
+        for label, values in sorted(series.items()):
+            total = 0
+            bounds = [str(bucket) for bucket in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, values):
+                total += count
+                lines.append(f'{self.name}_bucket{{endpoint="{label}",le="{bound}"}} {total}')
+            lines.append(f'{self.name}_sum{{endpoint="{label}"}} {values[-1]:.6f}')
+            lines.append(f'{self.name}_count{{endpoint="{label}"}} {total}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Description: Collects the timings of each request by endpoint. SQL is
+    timed by engine events and templates by the Flask render signals.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.server_timing = True
+        self.slow_request = 0
+        self.histograms = [
+            Histogram('journal_request_duration_seconds',
+                      'Wall time of requests', TIME_BUCKETS),
+            Histogram('journal_sql_duration_seconds',
+                      'SQL time per request', TIME_BUCKETS),
+            Histogram('journal_sql_queries',
+                      'SQL statements per request', COUNT_BUCKETS),
+            Histogram('journal_template_duration_seconds',
+                      'Template render time per request', TIME_BUCKETS),
+            Histogram('journal_translation_duration_seconds',
+                      'Translation time per request', TIME_BUCKETS),
+        ]
+
+    def init_app(self, app):
+        self.app = app
+        self.server_timing = app.config['METRICS_SERVER_TIMING']
+        # Slow request threshold in seconds, 0 to not log them
+        self.slow_request = app.config['METRICS_SLOW_REQUEST_MS'] / 1000
+        with app.app_context():
+            sa.event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            sa.event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+        before_render_template.connect(before_render, app)
+        template_rendered.connect(after_render, app)
+
+    def start(self):
+        # Start timing the request unless already started
+        if 'timings' not in g:
+            g.timings = Timings(record_statements=bool(self.slow_request))
+        return g.timings
+
+    def finish(self, response):
+        """
+        Description: Record the timings of the request and add the
+        Server-Timing header
+        Param: response - Response of the request
+        Return: The response
+        """
+
+        timings = g.get('timings')
+        if timings is None:
+            return response
+        elapsed = timings.elapsed
+        endpoint = request.endpoint or 'none'
+        request_time, sql_time, queries, template_time, translation_time = self.histograms
+        request_time.observe(endpoint, elapsed)
+        sql_time.observe(endpoint, timings.sql)
+        queries.observe(endpoint, timings.queries)
+        template_time.observe(endpoint, timings.template)
+        translation_time.observe(endpoint, timings.translation)
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = ', '.join([
+                f'app;dur={elapsed * 1000:.1f}',
+                f'db;dur={timings.sql * 1000:.1f};desc="{timings.queries} queries"',
+                f'tpl;dur={timings.template * 1000:.1f}',
+                f'trans;dur={timings.translation * 1000:.1f}',
+            ])
+        if self.slow_request and elapsed >= self.slow_request:
+            self.log_slow(endpoint, elapsed, timings)
+        return response
+
+    def log_slow(self, endpoint, elapsed, timings):
+        lines = [f"Slow request {request.method} {request.full_path.rstrip('?')} "
+                 f'({endpoint}) {elapsed * 1000:.1f} ms, '
+                 f'{timings.queries} queries {timings.sql * 1000:.1f} ms']
+        for statement, duration in timings.statements:
+            lines.append(f'  {duration * 1000:.1f} ms: {statement}')
+        self.app.logger.warning('\n'.join(lines))
+
+    def exposition(self):
+        return [line for histogram in self.histograms
+                for line in histogram.exposition()]
+
+
+request_metrics = RequestMetrics()
+
+
+def current_timings():
+    # Timings of the current request, None outside of requests
+    if has_request_context():
+        return g.get('timings')
+    return None
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings()
+    if timings is None:
+        return
+    duration = perf_counter() - conn.info.pop('query_start', perf_counter())
+    timings.queries += 1
+    timings.sql += duration
+    if timings.statements is not None:
+        timings.statements.append((' '.join(statement.split()), duration))
+
+
+def before_render(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        # Time only the outermost template of nested renders
+        if timings.template_depth == 0:
+            timings.template_start = perf_counter()
+        timings.template_depth += 1
+
+
+def after_render(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings.template_depth:
+        timings.template_depth -= 1
+        if timings.template_depth == 0:
+            timings.template += perf_counter() - timings.template_start
+
+
+def record_translation(duration):
+    # Called by the translation client for calls made by a request
+    timings = current_timings()
+    if timings is not None:
+        timings.translation += duration
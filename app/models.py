@@ -7,20 +7,31 @@ Description: Data structure models for microblog app
 
 Revisions:
 01/03/2025 Update User class for login functionality
+10/18/2026 Add Translation model to store translated posts
+10/18/2026 Keep follower and following counts in User columns
+10/18/2026 Add optional materialized timeline table
+10/18/2026 Load post authors together with the posts
+10/18/2026 Store the avatar digest of the email address
+10/18/2026 Hash passwords in the password hashing pool
+10/18/2026 Add composite indexes and case-insensitive username check
+10/18/2026 Import jwt when a reset token is made or checked
+10/18/2026 Load author emails for avatars that are not backfilled
+10/18/2026 Note that migrations skip the lower(username) index
+10/18/2026 Skip posts already in a timeline instead of failing
 
 '''
 
-import jwt
 import sqlalchemy as sa
 import sqlalchemy.orm as so
 from app.config import Config
 from app.extensions import db
+from app.passwords import password_hasher
 from datetime import datetime, timezone
+from flask import current_app, url_for
 from flask_login import UserMixin
-from hashlib import md5
+from hashlib import md5, sha256
 from time import time
 from typing import Optional
-from werkzeug.security import generate_password_hash, check_password_hash
 
 # Association table for follower/followed many to many relationships
 followers = sa.Table(
@@ -29,9 +40,63 @@ followers = sa.Table(
     sa.Column('follower_id', sa.Integer, sa.ForeignKey('user.id'),
               primary_key=True),
     sa.Column('followed_id', sa.Integer, sa.ForeignKey('user.id'),
-              primary_key=True)
+              primary_key=True),
+    # The primary key covers follower lookups, this one followed lookups
+    sa.Index('ix_followers_followed_id_follower_id', 'followed_id',
+             'follower_id')
 )
 
+# Materialized home timeline, one row per post a user should see.
+# Only used when TIMELINE_MODE is 'fanout'
+timeline = sa.Table(
+    'timeline',
+    db.metadata,
+    sa.Column('user_id', sa.Integer, sa.ForeignKey('user.id'),
+              primary_key=True),
+    sa.Column('post_id', sa.Integer, sa.ForeignKey('post.id'),
+              primary_key=True),
+    sa.Column('timestamp', sa.DateTime, nullable=False),
+    sa.Index('ix_timeline_user_id_timestamp', 'user_id', 'timestamp',
+             'post_id')
+)
+
+
+def email_digest(email):
+    # Gravatar digest of an email address
+    return md5(email.strip().lower().encode('utf-8')).hexdigest()
+
+
+def avatar_url(digest, size):
+    # Self hosted identicon or Gravatar image of an avatar digest
+    if current_app.config['AVATAR_MODE'] == 'local':
+        return url_for('pages.avatar', digest=digest, s=size)
+    return f'https://www.gravatar.com/avatar/{digest}?d=identicon&s={size}'
+
+
+def timeline_enabled():
+    return current_app.config['TIMELINE_MODE'] == 'fanout'
+
+
+def upsert_insert(dialect):
+    # insert() with ON CONFLICT for the database, None if it has none.
+    # Imported here, the engine has loaded its own dialect anyway.
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
+
+def timeline_insert():
+    # Insert into the timeline that skips posts already there. Following
+    # an author backfills posts whose job has not added them yet.
+    insert = upsert_insert(db.engine.dialect.name)
+    if insert is None:
+        return sa.insert(timeline).prefix_with('IGNORE', dialect='mysql')
+    return insert(timeline).on_conflict_do_nothing()
+
 
 class User(db.Model, UserMixin):
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
@@ -46,71 +111,169 @@ class User(db.Model, UserMixin):
                                              unique=True)
     password: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256))
 
+    # Set with the email, backfilled by 'flask avatars backfill'
+    avatar_hash: so.Mapped[Optional[str]] = so.mapped_column(sa.String(32))
+
     about_me: so.Mapped[Optional[str]] = so.mapped_column(sa.String(140))
 
     last_seen: so.Mapped[Optional[datetime]] = so.mapped_column(
         default=lambda: datetime.now(timezone.utc))
 
+    # Maintained by follow/unfollow, repaired by 'flask counters repair'
+    followers_total: so.Mapped[int] = so.mapped_column(default=0,
+                                                       server_default='0')
+    following_total: so.Mapped[int] = so.mapped_column(default=0,
+                                                       server_default='0')
+
     posts: so.WriteOnlyMapped['Post'] = so.relationship(
         back_populates='author')
     
+    @staticmethod
+    def username_taken(username):
+        # Signup check for names that differ only by case. SQLite's lower()
+        # only folds ASCII, so the exact name is matched as well. Lookups
+        # elsewhere are exact, like the unique constraint.
+        return sa.or_(User.username == username,
+                      sa.func.lower(User.username) == username.lower())
+
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        # Hashed with parameters other than PASSWORD_HASH_METHOD
+        return password_hasher.needs_rehash(self.password)
 
     def __repr__(self):
         return f'<User: {self.username}>'
     
+    @so.validates('email')
+    def validate_email(self, key, email):
+        # Keep the avatar digest in step with the email address
+        self.avatar_hash = email_digest(email)
+        return email
+
     def avatar(self, size):
-        digest = md5(self.email.lower().encode('utf-8')).hexdigest()
-        return f'https://www.gravatar.com/avatar/{digest}?d=identicon&s={size}'
+        digest = self.avatar_hash or email_digest(self.email)
+        return avatar_url(digest, size)
+
+    @staticmethod
+    def backfill_avatar_hashes(batch_size=500):
+        # Set the avatar digest of users created before the column existed
+        total = 0
+        while True:
+            users = db.session.execute(
+                sa.select(User.id, User.email)
+                .where(User.avatar_hash.is_(None))
+                .limit(batch_size)).all()
+            if not users:
+                return total
+            db.session.execute(
+                sa.update(User),
+                [{'id': user.id, 'avatar_hash': email_digest(user.email)}
+                 for user in users])
+            db.session.commit()
+            total += len(users)
     
     def follow(self, user):
         if not self.is_following(user):
             self.following.add(user)
+            # Update the counters in the database in the same transaction
+            self.following_total = User.following_total + 1
+            user.followers_total = User.followers_total + 1
+            if timeline_enabled():
+                # Backfill the posts of the followed user
+                db.session.execute(
+                    timeline_insert().from_select(
+                        ['user_id', 'post_id', 'timestamp'],
+                        sa.select(sa.literal(self.id), Post.id, Post.timestamp)
+                        .where(Post.user_id == user.id)))
 
     def unfollow(self, user):
         if self.is_following(user):
             self.following.remove(user)
+            self.following_total = User.following_total - 1
+            user.followers_total = User.followers_total - 1
+            if timeline_enabled():
+                # Trim the posts of the unfollowed user
+                db.session.execute(
+                    sa.delete(timeline)
+                    .where(timeline.c.user_id == self.id)
+                    .where(timeline.c.post_id.in_(
+                        sa.select(Post.id).where(Post.user_id == user.id))))
 
     def is_following(self, user):
         query = self.following.select().where(User.id == user.id)
         return db.session.scalar(query) is not None
 
     def followers_count(self):
-        query = sa.select(sa.func.count()).select_from(
-            self.followers.select().subquery())
-        return db.session.scalar(query)
+        return self.followers_total
 
     def following_count(self):
-        query = sa.select(sa.func.count()).select_from(
-            self.following.select().subquery())
-        return db.session.scalar(query)
+        return self.following_total
+
+    @staticmethod
+    def repair_follow_counts():
+        # Recount the followers table into the counter columns
+        followers_query = (sa.select(sa.func.count())
+                           .where(followers.c.followed_id == User.id)
+                           .scalar_subquery())
+        following_query = (sa.select(sa.func.count())
+                           .where(followers.c.follower_id == User.id)
+                           .scalar_subquery())
+        result = db.session.execute(
+            sa.update(User)
+            .where(sa.or_(User.followers_total != followers_query,
+                          User.following_total != following_query))
+            .values(followers_total=followers_query,
+                    following_total=following_query)
+            .execution_options(synchronize_session=False))
+        return result.rowcount
+
+    @staticmethod
+    def following_posts_keys():
+        # Timestamp and id columns following_posts is ordered by
+        if timeline_enabled():
+            return timeline.c.timestamp, timeline.c.post_id
+        return Post.timestamp, Post.id
 
     def following_posts(self):
-        Author = so.aliased(User)
-        Follower = so.aliased(User)
+        timestamp_key, id_key = self.following_posts_keys()
+        if timeline_enabled():
+            # Single range scan of the materialized timeline
+            return (
+                sa.select(Post)
+                .join(timeline, timeline.c.post_id == Post.id)
+                .where(timeline.c.user_id == self.id)
+                .options(Post.with_author())
+                .order_by(timestamp_key.desc(), id_key.desc())
+            )
+
+        # Posts of the user and of the followed users. Without the
+        # join to the followers there are no duplicates to group away.
+        followed = (sa.select(followers.c.followed_id)
+                    .where(followers.c.follower_id == self.id))
         return (
             sa.select(Post)
-            .join(Post.author.of_type(Author))
-            .join(Author.followers.of_type(Follower), isouter=True)
             .where(sa.or_(
-                Follower.id == self.id,
-                Author.id == self.id,
+                Post.user_id == self.id,
+                Post.user_id.in_(followed),
             ))
-            .group_by(Post)
-            .order_by(Post.timestamp.desc())
+            .options(Post.with_author())
+            .order_by(timestamp_key.desc(), id_key.desc())
         )
     
     def get_reset_password_token(self, expires_in=600):
+        import jwt
         return jwt.encode(
             {'reset_password': self.id, 'exp': time() + expires_in},
             Config.SECRET_KEY, algorithm='HS256')  
 
     @staticmethod
     def verify_reset_password_token(token):
+        import jwt
         try:
             id = jwt.decode(token, Config.SECRET_KEY,
                             algorithms=['HS256'])['reset_password']
@@ -138,12 +301,91 @@ class Post(db.Model):
     timestamp: so.Mapped[datetime] = so.mapped_column(
                 index=True, 
                 default=lambda: datetime.now(timezone.utc))
-    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey(User.id),
-                                               index=True)
+    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey(User.id))
     language: so.Mapped[Optional[str]] = so.mapped_column(sa.String(5))
     # One to many relationship for user and posts
     author: so.Mapped[User] = so.relationship(back_populates='posts')
 
     def __repr__(self):
         return f'<Post: {self.body}>'
-    
+
+    @staticmethod
+    def with_author():
+        # Loader option for listings, fetches the author columns used by
+        # _post.html in the same query as the posts. The email is the
+        # avatar of users not yet backfilled by 'flask avatars backfill'.
+        return so.joinedload(Post.author).load_only(
+            User.id, User.username, User.avatar_hash, User.email)
+
+    def add_to_timelines(self):
+        # Copy a flushed post into the timelines of its author and followers
+        if not timeline_enabled():
+            return
+        db.session.execute(timeline_insert().values(
+            user_id=self.user_id, post_id=self.id, timestamp=self.timestamp))
+        db.session.execute(
+            timeline_insert().from_select(
+                ['user_id', 'post_id', 'timestamp'],
+                sa.select(followers.c.follower_id, sa.literal(self.id),
+                          sa.literal(self.timestamp, sa.DateTime))
+                .where(followers.c.followed_id == self.user_id)))
+
+    @staticmethod
+    def rebuild_timelines():
+        # Refill the timeline table from the posts and followers tables
+        db.session.execute(sa.delete(timeline))
+        own_posts = sa.select(Post.user_id, Post.id, Post.timestamp)
+        followed_posts = (
+            sa.select(followers.c.follower_id, Post.id, Post.timestamp)
+            .join(Post, Post.user_id == followers.c.followed_id))
+        result = db.session.execute(
+            sa.insert(timeline).from_select(
+                ['user_id', 'post_id', 'timestamp'],
+                sa.union_all(own_posts, followed_posts)))
+        return result.rowcount
+
+    def content_hash(self):
+        # Changes whenever the title or body of the post is edited
+        content = f'{self.title or ""}\x00{self.body}'
+        return sha256(content.encode('utf-8')).hexdigest()
+
+
+# Posts of a user newest first, also serves user_id lookups
+sa.Index('ix_post_user_id_timestamp', Post.user_id, Post.timestamp.desc())
+
+# Case-insensitive signup check, see User.username_taken. flask db migrate
+# skips expression indexes on SQLite, create it with flask schema indexes
+# or op.create_index('ix_user_username_lower', 'user',
+# [sa.text('lower(username)')]) in a migration
+sa.Index('ix_user_username_lower', sa.func.lower(User.username))
+
+
+class Translation(db.Model):
+    __table_args__ = (
+        sa.UniqueConstraint('post_id', 'content_hash', 'src', 'dest'),
+    )
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    post_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey(Post.id),
+                                               index=True)
+    content_hash: so.Mapped[str] = so.mapped_column(sa.String(64))
+    src: so.Mapped[str] = so.mapped_column(sa.String(5))
+    dest: so.Mapped[str] = so.mapped_column(sa.String(5))
+    title: so.Mapped[Optional[str]] = so.mapped_column(sa.Text)
+    body: so.Mapped[str] = so.mapped_column(sa.Text)
+    timestamp: so.Mapped[datetime] = so.mapped_column(
+                default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<Translation: {self.post_id} {self.src}->{self.dest}>'
+
+
+# Remove stored translations of a post once its content changes
+@sa.event.listens_for(Post, 'after_update')
+def purge_stale_translations(mapper, connection, target):
+    connection.execute(
+        sa.delete(Translation)
+        .where(Translation.post_id == target.id)
+        .where(Translation.content_hash != target.content_hash())
+    )
+
@@ -0,0 +1,146 @@
+"""
+Program: Pagination
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Cursor (keyset) and page number pagination of post listings
+
+Revisions:
+10/18/2026 Allow any sort column, such as search relevance, as the key
+10/18/2026 Let a listing choose page numbers whatever PAGINATION_MODE is
+
+"""
+
+import base64
+import json
+import sqlalchemy as sa
+from datetime import datetime
+from flask import current_app, request, url_for
+from app.extensions import db
+from app.models import Post
+
+
+def encode_cursor(values):
+    # Opaque token for the sort value (usually the timestamp) and id of a post
+    sort_value, post_id = values
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    data = json.dumps([sort_value, post_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort_key):
+    # Returns None for missing or tampered tokens
+    if not token:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, post_id = json.loads(data)
+        if isinstance(sort_key.type, sa.DateTime):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif not isinstance(sort_value, (int, float)):
+            return None
+        return sort_value, int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+
+class KeysetPage:
+    """
+    Description: One page of posts fetched with a keyset cursor. Every
+    page costs the same single indexed query, no OFFSET and no COUNT.
+    """
+
+    def __init__(self, items, prev_url, next_url):
+        self.items = items
+        self.prev_url = prev_url
+        self.next_url = next_url
+        # Page numbers are not known in keyset mode
+        self.page = None
+        self.pages = None
+
+    @property
+    def has_prev(self):
+        return self.prev_url is not None
+
+    @property
+    def has_next(self):
+        return self.next_url is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class OffsetPage(KeysetPage):
+    """
+    Description: Page of posts fetched by page number with db.paginate
+    """
+
+    def __init__(self, pagination, endpoint, values):
+        prev_url = None
+        next_url = None
+        if pagination.has_prev:
+            prev_url = url_for(endpoint, page=pagination.prev_num, **values)
+        if pagination.has_next:
+            next_url = url_for(endpoint, page=pagination.next_num, **values)
+        super().__init__(pagination.items, prev_url, next_url)
+        self.page = pagination.page
+        self.pages = pagination.pages
+
+
+def paginate_posts(query, endpoint, keys=None, mode=None, **values):
+    """
+    Description: Paginate a post query by the 'after' and 'before' cursors
+    of the request, or by page number when PAGINATION_MODE is 'offset'
+    Param: query - Select of Post
+    Param: endpoint - Endpoint used to build the previous and next links
+    Param: keys - Sort and id columns the query is ordered by, newest or
+    best first. Defaults to Post.timestamp and Post.id
+    Param: mode - 'keyset' or 'offset', defaults to PAGINATION_MODE
+    Param: values - Extra url values of the endpoint
+    Return: KeysetPage or OffsetPage
+    """
+
+    per_page = current_app.config['POSTS_PER_PAGE']
+    sort_key, id_key = keys or (Post.timestamp, Post.id)
+
+    if (mode or current_app.config['PAGINATION_MODE']) == 'offset':
+        page = request.args.get('page', 1, type=int)
+        query = query.order_by(None).order_by(sort_key.desc(),
+                                              id_key.desc())
+        pagination = db.paginate(query, page=page, per_page=per_page,
+                                 error_out=False)
+        return OffsetPage(pagination, endpoint, values)
+
+    query = query.add_columns(sort_key, id_key).order_by(None)
+    after = decode_cursor(request.args.get('after'), sort_key)
+    before = decode_cursor(request.args.get('before'), sort_key)
+    key = sa.tuple_(sort_key, id_key)
+    types = [sort_key.type, id_key.type]
+
+    if before is not None:
+        # Walk backwards, then put the page back in newest first order
+        rows = db.session.execute(
+            query.where(key > sa.tuple_(*before, types=types))
+            .order_by(sort_key.asc(), id_key.asc())
+            .limit(per_page + 1)).all()
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            query = query.where(key < sa.tuple_(*after, types=types))
+        rows = db.session.execute(
+            query.order_by(sort_key.desc(), id_key.desc())
+            .limit(per_page + 1)).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after is not None
+
+    prev_url = None
+    next_url = None
+    if rows and has_prev:
+        prev_url = url_for(endpoint, before=encode_cursor(rows[0][1:]), **values)
+    if rows and has_next:
+        next_url = url_for(endpoint, after=encode_cursor(rows[-1][1:]), **values)
+    return KeysetPage([row[0] for row in rows], prev_url, next_url)
@@ -0,0 +1,90 @@
+"""
+Program: Passwords
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Password hashing in a dedicated process pool, so slow hashes
+run on every core and do not hold the GIL of the request threads
+
+Revisions:
+10/18/2026 Start a new pool in forked workers
+
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHasher:
+    """
+    Description: Bounded process pool for werkzeug password hashing.
+    With 0 workers the hashes run in the calling thread.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.workers = 0
+        self.timeout = 30
+        self._prefix = None
+        self._executor = None
+        self._slots = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self._prefix = None
+
+    def _start(self):
+        # The pool is started on first use, with fresh interpreters
+        # rather than forks of a threaded process
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'))
+                # Hashes running plus one waiting per worker
+                self._slots = BoundedSemaphore(self.workers * 2)
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+        self._start()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError('Password hashing pool is busy')
+        try:
+            return self._executor.submit(function, *args).result(
+                timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        # True when a hash was made with other parameters than the
+        # configured method, e.g. 'scrypt:32768:8:1'
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+    def after_fork(self):
+        # The pool processes belong to the parent, a forked worker starts its own
+        self._executor = None
+        self._slots = None
+        self._lock = Lock()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
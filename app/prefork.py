@@ -0,0 +1,75 @@
+"""
+Program: Prefork
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Preloading the app in a server's master process. The app
+is warmed up once before the workers are forked, and each worker drops
+the connections, threads and pools it inherited from the master.
+
+Revisions:
+10/18/2026 Reset the last seen tracker in forked workers
+
+"""
+
+import os
+import sqlalchemy.orm as so
+from flask_babel import force_locale, get_translations
+from app.activity import last_seen_tracker
+from app.email import mail_dispatcher
+from app.extensions import db, reset_translator
+from app.jobs import post_jobs, translation_jobs
+from app.log import restart_logging
+from app.passwords import password_hasher
+from app.text import warm_detector
+from app.trans import translation_client
+
+
+def warm_up(app):
+    """
+    Description: Compile the templates, load the message catalogs and
+    language profiles and configure the mappers, so forked workers share
+    them and the first requests do not pay for them
+    Param: app - Flask application
+    """
+
+    so.configure_mappers()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.test_request_context():
+        for language in app.config['LANGUAGES']:
+            with force_locale(language):
+                get_translations()
+    warm_detector()
+
+
+def after_fork(app):
+    """
+    Description: Run in each forked worker. Connections of the master are
+    dropped without closing them, and background threads are started
+    again on first use.
+    Param: app - Flask application
+    """
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    reset_translator()
+    translation_client.after_fork()
+    translation_jobs.after_fork()
+    post_jobs.after_fork()
+    mail_dispatcher.after_fork()
+    password_hasher.after_fork()
+    last_seen_tracker.after_fork()
+    restart_logging(app)
+
+
+def prepare_for_fork(app):
+    """
+    Description: Warm up the app and have every process forked from now
+    on reset its inherited resources
+    Param: app - Flask application
+    """
+
+    warm_up(app)
+    os.register_at_fork(after_in_child=lambda: after_fork(app))
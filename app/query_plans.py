@@ -0,0 +1,135 @@
+"""
+Program: Query Plans
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Runs EXPLAIN on the SQL of the main pages to catch queries
+that scan a whole table instead of using an index
+
+Revisions:
+
+"""
+
+import contextvars
+import json
+import re
+import sqlalchemy as sa
+from flask import current_app
+from app.extensions import db
+from app.models import Post, User
+from app.trans import translation_cache
+
+# Pages checked, and whether they are requested by a logged in user
+ROUTES = (
+    ('/', False),
+    ('/', True),
+    ('/user/{username}', True),
+    ('/search/?searched={word}', False),
+    ('/profile/{username}', False),
+    ('/profile_popup/{username}', False),
+)
+
+# SQLite reports a full table scan as 'SCAN post' or 'SCAN TABLE post'
+SQLITE_FULL_SCAN = re.compile(r'SCAN (?:TABLE )?(\w+)$')
+
+
+def sqlite_plan(connection, statement, parameters):
+    rows = connection.exec_driver_sql(
+        f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    details = [row[-1] for row in rows]
+    scans = [match.group(1) for match in map(SQLITE_FULL_SCAN.match, details)
+             if match]
+    return details, scans
+
+
+def postgresql_plan(connection, statement, parameters):
+    # Sequential scans of small tables are cheap, so PostgreSQL picks
+    # them anyway. Turned off, a Seq Scan means no index could be used.
+    connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    plan = connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    details = []
+    scans = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        details.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+        if node['Node Type'] == 'Seq Scan':
+            scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return details, scans
+
+
+PLANNERS = {
+    'sqlite': sqlite_plan,
+    'postgresql': postgresql_plan,
+}
+
+
+def capture_statements(run):
+    """
+    Description: Collect the SELECT statements run by a function
+    Param: run - Function to call
+    Return: List of (statement, parameters) tuples
+    """
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    sa.event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        sa.event.remove(db.engine, 'before_cursor_execute', capture)
+    return statements
+
+
+def check_query_plans():
+    """
+    Description: Request each page in ROUTES and explain every SELECT it
+    runs, plus the translation cache lookup. Needs at least one entry.
+    Return: List of dictionaries with the page, statement, plan and the
+    tables scanned in full
+    """
+
+    planner = PLANNERS.get(db.engine.dialect.name)
+    if planner is None:
+        raise ValueError(f'Query plans of {db.engine.dialect.name} are not supported')
+    post = db.session.scalar(sa.select(Post).order_by(Post.id.desc()).limit(1))
+    if post is None:
+        raise ValueError('Add at least one entry before checking query plans')
+    user = db.session.get(User, post.user_id)
+    word = re.findall(r'\w+', post.title or post.body)[0]
+
+    client = current_app.test_client()
+    checks = []
+    for route, logged_in in ROUTES:
+        url = route.format(username=user.username, word=word)
+        with client.session_transaction() as session:
+            session.clear()
+            if logged_in:
+                session['_user_id'] = str(user.id)
+                session['_fresh'] = True
+        label = f'{url} (logged in)' if logged_in else url
+        # An empty context, so the request gets its own app context and g
+        # instead of sharing the one of the command
+        checks.append((label, capture_statements(
+            lambda: contextvars.Context().run(client.get, url))))
+    checks.append(('translation cache', capture_statements(
+        lambda: translation_cache.get(post, 'en'))))
+
+    results = []
+    for label, statements in checks:
+        for statement, parameters in statements:
+            # Each plan in its own transaction, for SET LOCAL
+            with db.engine.connect() as connection:
+                with connection.begin():
+                    plan, scans = planner(connection, statement, parameters)
+            results.append({'page': label, 'statement': statement,
+                            'plan': plan, 'full_scans': scans})
+    return results
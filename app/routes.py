@@ -7,29 +7,58 @@ Description: Routes file for Flask microblog application
 
 Revisions:
 02/03/2025 Update text to support German translation
+10/18/2026 Serve translations from the translation cache
+10/18/2026 Queue new entries for background translation
+10/18/2026 Handle translation timeouts
+10/18/2026 Add trans_many route to translate several entries at once
+10/18/2026 Add new entries to the materialized timelines
+10/18/2026 Paginate listings with keyset cursors, search with GET
+10/18/2026 Search titles and bodies with the full-text index
+10/18/2026 Load post authors with the listing queries
+10/18/2026 Mark post bodies safe with a template filter
+10/18/2026 Record last seen times with the last seen tracker
+10/18/2026 Load the full user row only in routes that change it
+10/18/2026 Serve entries and profile popups from the fragment cache
+10/18/2026 Answer conditional GETs of anonymous pages
+10/18/2026 Add self hosted identicon avatars
+10/18/2026 Rehash passwords on login when the hash parameters change
+10/18/2026 Add mail dispatcher counters to metrics
+10/18/2026 Time requests by endpoint, add Server-Timing and histograms
+10/18/2026 Store new entries at once, detect their language in the background
+10/18/2026 Answer 503 when the password hashing pool is busy
+10/18/2026 Page search results by page number
+10/18/2026 Remove the unused desc import and commented query
 
 """
 
-import asyncio
-import bleach
+import re
 import sqlalchemy as sa
-from datetime import datetime, timezone
-from flask import Blueprint, current_app, flash, g, render_template, redirect, request, url_for
+from flask import (Blueprint, abort, current_app, flash, g, jsonify, make_response,
+                   render_template, redirect, request, url_for)
 from flask_babel import _, get_locale
 from flask_login import current_user, login_required, login_user, logout_user
-from langdetect import detect, LangDetectException
 from markupsafe import Markup
-from sqlalchemy import desc
 from urllib.parse import urlparse, urljoin
-from app.config import Config
+from app.cache import fragment_cache
 from app.forms import (LoginForm, SignupForm, EditProfileForm,
                        FollowForm, PostForm, ResetPasswordRequestForm,
                        ResetPasswordForm, SearchForm
                        )
-from app.email import send_password_reset_email
+from app.activity import last_seen_tracker
+from app.auth import principal_cache
+from app.avatars import identicon_svg
+from app.email import mail_dispatcher, send_password_reset_email
 from app.extensions import db
+from app.http_cache import (conditional_page, latest_post_version,
+                            static_version, user_version)
+from app.fragments import invalidate_profile, render_profile
 from app.models import User, Post
-from app.trans import translate_text
+from app.pagination import paginate_posts
+from app.search import search_posts
+from app.text import sanitize
+from app.jobs import post_jobs, process_post, translation_jobs
+from app.metrics import request_metrics
+from app.trans import translate_many, translate_post, translation_cache
 
 pages = Blueprint('pages', __name__)
 
@@ -44,34 +73,42 @@ def is_safe_redirect_url(target):
 
 @pages.before_request
 def before_request():
-    # Set date/time of last page view
+    request_metrics.start()
+    # Set date/time of last page view, written in bulk once per interval
     if current_user.is_authenticated:
-        current_user.last_seen = datetime.now(timezone.utc)
-        db.session.commit()
+        last_seen_tracker.touch(current_user.id)
     # Set local formatting for date/time
     g.locale = str(get_locale())
 
+@pages.after_request
+def after_request(response):
+    # Record timings and add the Server-Timing header
+    return request_metrics.finish(response)
+
+def hashing_busy(template, **context):
+    # The password hashing pool is saturated, keep the form to try again
+    flash(_('The server is busy. Please try again in a few seconds.'), 'error')
+    response = make_response(render_template(template, **context), 503)
+    response.headers['Retry-After'] = '5'
+    return response
+
+@pages.app_template_filter('sanitized')
+def sanitized(html):
+    # Mark HTML sanitized by bleach when it was saved as safe, without
+    # changing the Post instance that holds it
+    return Markup(html)
+
 # Application routes
 
 @pages.route('/', methods=['GET', 'POST'])
 @pages.route('/index/', methods=['GET', 'POST'])
+@conditional_page(latest_post_version)
 def index():
     head_title = _('Home')
     page_title = _('Journal Posts')
-    page = request.args.get('page', 1, type=int)
-
-    # posts = db.session.scalars(db.select(Post).order_by(desc(Post.timestamp))).all()
-    posts = db.paginate(db.select(Post).order_by(desc(Post.timestamp)),
-                        page=page,
-                        per_page = current_app.config['POSTS_PER_PAGE'],
-                        # per_page=Config.POSTS_PER_PAGE,
-                        error_out=False
-                        )
-
-    # Mark the sanitized HTML as safe
-    for post in posts:
-        post.body = Markup(post.body)
 
+    posts = paginate_posts(db.select(Post).options(Post.with_author()),
+                           'pages.index')
 
     return render_template('index.html',
                            head_title=head_title,
@@ -93,10 +130,23 @@ def login():
     if form.validate_on_submit():
         user = db.session.scalar(
             sa.select(User).where(User.username == form.username.data))
-        if user is None or not user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except TimeoutError:
+            return hashing_busy('login.html', head_title=head_title,
+                                page_title=page_title, form=form)
+        if not valid:
             flash(_('Invalid login. Check your username and password.'), 
                     'error')
             return redirect(url_for('pages.login'))
+        # Upgrade the hash when the hash parameters have changed
+        if user.password_needs_rehash():
+            try:
+                user.set_password(form.password.data)
+                db.session.commit()
+            except TimeoutError:
+                # Upgraded on a later login instead
+                db.session.rollback()
         login_user(user, remember=form.remember_me.data)
         # flash(f'{form.username.data} successfully logged in', 'success')
         flash(_('%(username)s successfully logged in' , username=form.username.data), 'success')
@@ -140,7 +190,11 @@ def signup():
     if form.validate_on_submit():
         user = User(username=form.username.data, email=form.email.data)
         
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except TimeoutError:
+            return hashing_busy('signup.html', head_title=head_title,
+                                page_title=page_title, form=form)
 
         db.session.add(user)
         db.session.commit()
@@ -166,19 +220,12 @@ def signup():
 @login_required
 def user(username):
     head_title = _('User Profile')
-    page = request.args.get('page', 1, type=int)
 
     user = db.first_or_404(sa.select(User).where(User.username == username))
 
-    posts = db.paginate(current_user.following_posts().order_by(Post.timestamp.desc()),
-                        page=page,
-                        per_page=Config.POSTS_PER_PAGE,
-                        error_out=False
-                        )
-
-    # Mark the sanitized HTML as safe
-    for post in posts:
-        post.body = Markup(post.body)
+    posts = paginate_posts(current_user.following_posts(), 'pages.user',
+                           keys=current_user.following_posts_keys(),
+                           username=username)
 
     # Set for follower/following form buttons
     form = FollowForm()
@@ -199,10 +246,13 @@ def edit_profile():
 
     # Handles valid submit
     if form.validate_on_submit():
-        current_user.firstname = form.firstname.data
-        current_user.lastname = form.lastname.data
-        current_user.about_me = form.about_me.data
+        user = current_user.load()
+        user.firstname = form.firstname.data
+        user.lastname = form.lastname.data
+        user.about_me = form.about_me.data
         db.session.commit()
+        principal_cache.invalidate(user.id)
+        invalidate_profile(user.username)
         flash('Your changes have been saved.', 'success')
     
         # Check the 'next' parameter for safe redirection
@@ -242,6 +292,8 @@ def follow(username):
             return redirect(url_for('pages.user', username=username))
         current_user.follow(user)
         db.session.commit()
+        invalidate_profile(user.username)
+        invalidate_profile(current_user.username)
         flash(f'You are following {username}!', 
                     'success')
         return redirect(url_for('pages.user', username=username))
@@ -265,6 +317,8 @@ def unfollow(username):
             return redirect(url_for('pages.user', username=username))
         current_user.unfollow(user)
         db.session.commit()
+        invalidate_profile(user.username)
+        invalidate_profile(current_user.username)
         flash(f'You are not following {username}.', 
                     'success')
         return redirect(url_for('pages.user', username=username))
@@ -283,22 +337,21 @@ def add_entry():
     
     form = PostForm()
     if form.validate_on_submit():
-        # Try to determine language of post
-        try:
-            language = detect(form.post.data)
-        except LangDetectException:
-            language = ''
-
         # Only allow safe text to be added to database
-        sanitized_body = bleach.clean(form.post.data, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
-        
+        sanitized_body = sanitize(form.post.data, ALLOWED_TAGS, ALLOWED_ATTRIBUTES)
+
+        # Language, timelines and translations are filled in afterwards
         post = Post(
             title=form.title.data,           
             body=sanitized_body, 
-            author=current_user,
-            language=language)
+            user_id=current_user.id)
         db.session.add(post)
+        db.session.flush()
+        post_id = post.id
         db.session.commit()
+        if not post_jobs.submit(post_id):
+            process_post(post_id)
+
         flash(_('Journal entry successfully added'), 'success')
         return redirect(url_for('pages.index'))
     
@@ -342,8 +395,12 @@ def reset_password(token):
         return redirect(url_for('pages.index'))
     form = ResetPasswordForm()
     if form.validate_on_submit():
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except TimeoutError:
+            return hashing_busy('reset_password.html', form=form)
         db.session.commit()
+        principal_cache.invalidate(user.id)
         flash(_('Your password has been reset.'), 'success')
         return redirect(url_for('pages.login'))
     return render_template('reset_password.html', form=form)
@@ -354,28 +411,14 @@ def trans_text(post_id):
     head_title = _('Translate')
     page_title = _('Translated Journal Entry')
 
-    post = db.session.scalars(db.select(Post).where(Post.id==post_id)).first()
+    post = db.first_or_404(db.select(Post).where(Post.id==post_id))
 
-    src_lang = post.language
-    dest_lang = g.locale
-    trans_title = post.title
-    trans_body = post.body
-
-    # Get the existing event loop or create a new one if none exists
+    # Translations are usually ready from the background jobs
     try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    # Run both translations concurrently
-    translated_title, translated_body = loop.run_until_complete(
-        asyncio.gather(
-            translate_text(text=trans_title, src=src_lang, dest=dest_lang),
-            translate_text(text=trans_body, src=src_lang, dest=dest_lang)
-        )
-    )
-
+        translated_title, translated_body = translate_post(post, g.locale)
+    except TimeoutError:
+        flash(_('The translation service is not responding. Try again later.'), 'error')
+        return redirect(url_for('pages.index'))
 
     return render_template('trans_text.html', 
                            head_title=head_title,
@@ -385,26 +428,45 @@ def trans_text(post_id):
                            translated_body=translated_body
                            )
 
-@pages.route('/search/', methods=['GET', 'POST'])
+@pages.route('/trans_many/')
+def trans_many():
+    # Comma separated post ids, e.g. /trans_many/?ids=3,2,1
+    try:
+        post_ids = [int(post_id) for post_id in request.args.get('ids', '').split(',')]
+    except ValueError:
+        abort(400)
+    if len(post_ids) > current_app.config['TRANSLATE_MANY_MAX']:
+        abort(400)
+
+    dest_lang = g.locale
+    try:
+        translations = translate_many(post_ids, dest_lang)
+    except TimeoutError:
+        abort(503)
+
+    posts = []
+    for post_id, translation in zip(post_ids, translations):
+        title, body = translation or (None, None)
+        posts.append({'id': post_id, 'title': title, 'body': body})
+    return jsonify(dest=dest_lang, posts=posts)
+
+@pages.route('/search/')
 def search():
     head_title = _('Search Results')
     page_title = _('Search Results')
-    page = request.args.get('page', 1, type=int)
 
     form = SearchForm()
 
-    if form.validate_on_submit():
+    if form.validate():
         searched = form.searched.data
-        
-        posts = db.paginate(db.select(Post).filter(Post.title.contains(searched)).order_by(desc(Post.timestamp)),
-                    page=page,
-                    per_page=Config.POSTS_PER_PAGE,
-                    error_out=False
-                    )
 
-        # Mark the sanitized HTML as safe
-        for post in posts:
-            post.body = Markup(post.body)
+        # Full-text search of title and body, best matches first. The
+        # relevance of every post changes with each new post, so it is no
+        # key for cursors and results are paged by page number.
+        query, keys = search_posts(searched)
+        posts = paginate_posts(query.options(Post.with_author()),
+                               'pages.search', keys=keys, mode='offset',
+                               searched=searched)
 
         return render_template('search.html', 
                                head_title=head_title,
@@ -417,6 +479,7 @@ def search():
     return render_template('search.html', form=form)
 
 @pages.route('/profile/<username>')
+@conditional_page(user_version)
 def profile(username):
     head_title = _('Author Profile')
     page_title = _('Author Profile')
@@ -430,11 +493,25 @@ def profile(username):
 )
 
 @pages.route('/profile_popup/<username>')
+@conditional_page(user_version)
 def profile_popup(username):
     user = db.first_or_404(sa.select(User).where(User.username == username))
-    return render_template('_profile_content.html', user=user)
+    return render_profile(user)
+
+@pages.route('/avatar/<digest>')
+def avatar(digest):
+    # Identicons for AVATAR_MODE=local, an image never changes
+    if not re.fullmatch(r'[0-9a-f]{32}', digest):
+        abort(404)
+    size = max(1, min(request.args.get('s', 80, type=int), 512))
+    response = make_response(identicon_svg(digest, size))
+    response.mimetype = 'image/svg+xml'
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    return response
 
 @pages.route('/about/')
+@conditional_page(static_version)
 def about():
     head_title = 'About Site'
     page_title = 'About this Site'
@@ -442,4 +519,23 @@ def about():
     return render_template('about.html',
                            head_title=head_title,
                            page_title=page_title
-                           )
\ No newline at end of file
+                           )
+
+@pages.route('/metrics/')
+def metrics():
+    # Plain text counters in the Prometheus exposition format
+    lines = []
+    for name, value in translation_cache.stats().items():
+        lines.append(f'journal_translation_cache_{name} {value}')
+    for name, value in translation_jobs.stats().items():
+        lines.append(f'journal_translation_jobs_{name} {value}')
+    for name, value in post_jobs.stats().items():
+        lines.append(f'journal_post_jobs_{name} {value}')
+    for name, value in fragment_cache.stats().items():
+        lines.append(f'journal_fragment_cache_{name} {value}')
+    for name, value in mail_dispatcher.stats().items():
+        lines.append(f'journal_mail_{name} {value}')
+    lines.extend(request_metrics.exposition())
+    response = make_response('\n'.join(lines) + '\n')
+    response.mimetype = 'text/plain'
+    return response
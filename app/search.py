@@ -0,0 +1,167 @@
+"""
+Program: Search
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Full-text search of journal entries. Uses an FTS5 table on
+SQLite and a tsvector column on PostgreSQL, kept in sync by the database.
+
+Revisions:
+10/18/2026 Return the relevance only to order by, not to page by
+10/18/2026 Keep the search index out of migrations
+10/18/2026 Scan titles and bodies when the index has not been created
+
+"""
+
+import re
+import sqlalchemy as sa
+from app.extensions import db
+from app.models import Post
+
+# SQLite external content FTS5 table over post title and body, with
+# triggers that keep it in sync on insert, update and delete
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+        title, body, content='post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN
+        INSERT INTO post_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_update AFTER UPDATE OF title, body ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO post_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+# PostgreSQL generated tsvector column with a GIN index, titles weigh more
+POSTGRESQL_DDL = [
+    """ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+        ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_post_search_vector
+        ON post USING gin (search_vector)""",
+]
+
+# Not part of db.metadata, the tables are created by the DDL above
+post_fts = sa.Table(
+    'post_fts',
+    sa.MetaData(),
+    sa.Column('rowid', sa.Integer),
+    sa.Column('post_fts', sa.Text),
+    sa.Column('rank', sa.Float)
+)
+
+# Database URLs known to have the search index
+indexed = set()
+
+for statement in SQLITE_DDL:
+    sa.event.listen(Post.__table__, 'after_create',
+                    sa.DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRESQL_DDL:
+    sa.event.listen(Post.__table__, 'after_create',
+                    sa.DDL(statement).execute_if(dialect='postgresql'))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Description: Alembic autogenerate filter that leaves the search index
+    alone, it is created by the DDL above rather than the models
+    Return: False for the FTS5 tables, the tsvector column and its index
+    """
+
+    if type_ == 'table':
+        return not name.startswith('post_fts')
+    return name not in ('search_vector', 'ix_post_search_vector')
+
+
+def create_search_index():
+    """
+    Description: Create the search index of an existing database and fill
+    it with the current posts
+    Return: Name of the database dialect
+    """
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            db.session.execute(sa.text(statement))
+        db.session.execute(sa.text(
+            "INSERT INTO post_fts(post_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_DDL:
+            db.session.execute(sa.text(statement))
+    db.session.commit()
+    indexed.add(db.engine.url)
+    return dialect
+
+
+def has_search_index(dialect):
+    """
+    Description: Check the database has the search index, which databases
+    created before it need flask search reindex for
+    Param: dialect - Name of the database dialect
+    Return: True if the index exists
+    """
+
+    if db.engine.url in indexed:
+        return True
+    inspector = sa.inspect(db.engine)
+    if dialect == 'sqlite':
+        found = inspector.has_table('post_fts')
+    elif dialect == 'postgresql':
+        found = any(column['name'] == 'search_vector'
+                    for column in inspector.get_columns('post'))
+    else:
+        found = False
+    if found:
+        indexed.add(db.engine.url)
+    return found
+
+
+def search_posts(text):
+    """
+    Description: Build a query of posts matching every word of the search
+    text, each word also matching as a prefix
+    Param: text - Search text entered by the reader
+    Return: Tuple of the select of Post and the (score, id) columns to
+    order it by, best match first
+    """
+
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return sa.select(Post).where(sa.false()), None
+
+    dialect = db.engine.dialect.name
+    if not has_search_index(dialect):
+        dialect = None
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25 rank is negative, lower is a better match
+        score = -post_fts.c.rank
+        query = (sa.select(Post)
+                 .join(post_fts, post_fts.c.rowid == Post.id)
+                 .where(post_fts.c.post_fts.op('MATCH')(match)))
+        return query, (score, Post.id)
+
+    if dialect == 'postgresql':
+        search_vector = sa.literal_column('post.search_vector')
+        match = sa.func.to_tsquery('simple',
+                                   ' & '.join(f'{term}:*' for term in terms))
+        score = sa.func.ts_rank(search_vector, match, type_=sa.Float)
+        query = sa.select(Post).where(search_vector.op('@@')(match))
+        return query, (score, Post.id)
+
+    # Other databases, or ones not yet reindexed, scan title and body,
+    # newest first
+    conditions = [sa.or_(Post.title.contains(term), Post.body.contains(term))
+                  for term in terms]
+    return sa.select(Post).where(*conditions), None
@@ -0,0 +1,128 @@
+"""
+Program: SMTP Stub
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Minimal local SMTP server that keeps received mail in memory,
+for trying out and benchmarking mail without a real mail server
+
+Run stub:
+python -m app.smtp_stub --port 8025
+then set MAIL_SERVER=localhost and MAIL_PORT=8025
+
+Revisions:
+10/18/2026 Refuse chosen recipients, to test failed mail
+
+"""
+
+import argparse
+import socketserver
+from threading import Lock, Thread
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """
+    Description: Speaks just enough SMTP for smtplib: HELO/EHLO, MAIL,
+    RCPT, DATA, RSET, NOOP and QUIT. No TLS and no authentication.
+    """
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost SMTP stub ready')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip(), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command[8:].strip()
+                if recipient.strip('<>') in self.server.refused:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.server.store(sender, recipients, self.read_data())
+                self.reply('250 OK')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                break
+            # Undo dot stuffing
+            if line.startswith(b'..'):
+                line = line[1:]
+            lines.append(line)
+        return b''.join(lines).decode('utf-8', 'replace')
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """
+    Description: Threaded SMTP stub server. Received mail is kept in
+    messages as (sender, recipients, data) tuples. Addresses in refused
+    are rejected.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='localhost', port=0, verbose=False, refused=()):
+        super().__init__((host, port), SMTPStubHandler)
+        self.verbose = verbose
+        self.refused = set(refused)
+        self.messages = []
+        self.connections = 0
+        self._lock = Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def store(self, sender, recipients, data):
+        with self._lock:
+            self.messages.append((sender, recipients, data))
+        if self.verbose:
+            print(f'From {sender} to {", ".join(recipients)}\n{data}')
+
+    def start(self):
+        # Serve in a background thread, returns the server
+        Thread(target=self.serve_forever, daemon=True,
+               name='smtp-stub').start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP stub server')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+    with SMTPStub(args.host, args.port, verbose=True) as server:
+        print(f'SMTP stub listening on {args.host}:{server.port}')
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
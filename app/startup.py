@@ -0,0 +1,56 @@
+"""
+Program: Startup
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Import time report of the app package, taken from
+python -X importtime in a fresh interpreter
+
+Revisions:
+
+"""
+
+import subprocess
+import sys
+from collections import defaultdict
+
+# Loaded on first use, none of them should be imported at startup
+LAZY_MODULES = ('googletrans', 'httpx', 'alembic', 'flask_migrate',
+                'bleach', 'langdetect', 'jwt')
+
+
+def import_times(statement='import app', cwd=None):
+    """
+    Description: Run a statement in a new interpreter with -X importtime
+    Param: statement - Python code to run
+    Param: cwd - Directory to run it in
+    Return: List of (module, self microseconds, cumulative microseconds)
+    in import order
+    """
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=cwd, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        times.append((module.strip(), int(own), int(cumulative)))
+    return times
+
+
+def by_package(times):
+    # Own import time summed by top-level package, slowest first
+    totals = defaultdict(int)
+    for module, own, cumulative in times:
+        totals[module.split('.')[0]] += own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def lazy_modules_loaded(times):
+    # Lazily loaded packages that were imported anyway
+    loaded = {module.split('.')[0] for module, own, cumulative in times}
+    return [module for module in LAZY_MODULES if module in loaded]
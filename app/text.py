@@ -0,0 +1,77 @@
+"""
+Program: Text
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Sanitizing and language detection of journal entries. Plain
+functions without the app context, so they also run in worker processes.
+
+Revisions:
+10/18/2026 Reuse prebuilt cleaners and warm the language detector
+10/18/2026 Import bleach and langdetect on first use
+
+"""
+
+from threading import Lock, local
+
+# Cleaners keep parser state, so every thread gets its own
+_cleaners = local()
+_warm_lock = Lock()
+
+
+def get_cleaner(tags, attributes):
+    """
+    Description: Prebuilt Cleaner for an allow-list, one per thread
+    Param: tags - Allowed tags
+    Param: attributes - Allowed attributes by tag
+    Return: bleach Cleaner
+    """
+
+    cleaners = _cleaners.__dict__.setdefault('cleaners', {})
+    key = (tuple(tags), repr(attributes))
+    cleaner = cleaners.get(key)
+    if cleaner is None:
+        # bleach brings html5lib, imported by the first entry instead of at startup
+        from bleach.sanitizer import Cleaner
+        cleaner = cleaners[key] = Cleaner(tags=tags, attributes=attributes)
+    return cleaner
+
+
+def sanitize(html, tags, attributes):
+    """
+    Description: Remove every tag and attribute that is not allowed
+    Param: html - Entry body as entered
+    Param: tags - Allowed tags
+    Param: attributes - Allowed attributes by tag
+    Return: Sanitized body
+    """
+
+    return get_cleaner(tags, attributes).clean(html)
+
+
+def warm_detector():
+    # Load the language profiles now rather than in the first detect
+    from langdetect.detector_factory import init_factory
+    with _warm_lock:
+        init_factory()
+    detect_language('warm up the language detector')
+
+
+def detect_language(text):
+    # Language code of the text, '' when it cannot be told
+    from langdetect import DetectorFactory, LangDetectException, detect
+    # Same language for the same text on every run
+    DetectorFactory.seed = 0
+    try:
+        return detect(text)
+    except LangDetectException:
+        return ''
+
+
+def prepare_post(job):
+    # Sanitize a post record and fill in its language, for Pool.imap
+    record, tags, attributes = job
+    record['body'] = sanitize(record['body'], tags, attributes)
+    if not record.get('language'):
+        record['language'] = detect_language(record['body'])
+    return record
@@ -2,14 +2,121 @@
 Program: Trans
 Author: Maya Name
 Creation Date: 02/08/2024
-Revision Date: 
+Revision Date: 10/18/2026
 Description: Translations using Google Translate API
 
 Revisions:
+10/18/2026 Cache translated posts in memory and in the database
+10/18/2026 Add stub translator and translate_post helper for background jobs
+10/18/2026 Run translations on one shared event loop thread
+10/18/2026 Add translate_many to translate several posts in few requests
+10/18/2026 Record translation time in the request metrics
+10/18/2026 Import googletrans when the first translation is made
+10/18/2026 Start a new event loop thread in forked workers
+10/18/2026 Store translations with an upsert
+10/18/2026 Strip every translated text the same way
+10/18/2026 Move upsert_insert to models, the timeline uses it too
 
 """
 
-from .extensions import translator
+import asyncio
+import re
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from threading import Lock, Thread
+from time import perf_counter
+from .cache import LRUCache
+from .extensions import db, get_translator
+from .metrics import record_translation
+from .models import Post, Translation, upsert_insert
+
+
+class StubTranslator:
+    """
+    Description: Offline stand-in for the Google Translate API, used for
+    tests and local development (TRANSLATOR_BACKEND=stub)
+    """
+
+    async def translate(self, text, dest='en', src='auto'):
+        from googletrans.models import Translated
+        # Mark every line with words in it as translated
+        lines = [f'[{dest}] {line}' if re.search(r'\w', line) else line
+                 for line in text.split('\n')]
+        return Translated(src=src, dest=dest, origin=text,
+                          text='\n'.join(lines), pronunciation=text)
+
+
+stub_translator = StubTranslator()
+
+
+class TranslationClient:
+    """
+    Description: Owns one long-lived event loop thread per process, so the
+    translator's connection pool is reused by every request and worker.
+    Calls are limited in concurrency and time.
+    """
+
+    def __init__(self):
+        self.backend = 'google'
+        self.timeout = 10
+        self.concurrency = 4
+        self._loop = None
+        self._semaphore = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.backend = app.config['TRANSLATOR_BACKEND']
+        self.timeout = app.config['TRANSLATION_TIMEOUT']
+        self.concurrency = app.config['TRANSLATION_CONCURRENCY']
+
+    @property
+    def translator(self):
+        if self.backend == 'stub':
+            return stub_translator
+        return get_translator()
+
+    def _start(self):
+        # The loop thread is started on first use
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            Thread(target=loop.run_forever, daemon=True,
+                   name='translation-loop').start()
+            self._loop = loop
+
+    def after_fork(self):
+        # Threads are not copied by fork, the worker starts its own loop
+        self._loop = None
+        self._semaphore = None
+        self._lock = Lock()
+
+    async def translate(self, text, src, dest):
+        # Limit the number of concurrent upstream requests
+        async with self._semaphore:
+            return await self.translator.translate(text=text, src=src, dest=dest)
+
+    def run(self, coro, timeout=None):
+        """
+        Description: Run a coroutine on the shared event loop and wait for it
+        Param: coro - Coroutine to be run
+        Param: timeout - Seconds to wait, defaults to TRANSLATION_TIMEOUT
+        Return: Result of the coroutine
+        """
+
+        self._start()
+        start = perf_counter()
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(coro, timeout or self.timeout), self._loop)
+        try:
+            return future.result()
+        finally:
+            record_translation(perf_counter() - start)
+
+
+translation_client = TranslationClient()
 
 
 async def translate_text(text:str, src:str, dest:str) -> str:
@@ -21,6 +128,275 @@ async def translate_text(text:str, src:str, dest:str) -> str:
     Return: Translated text
     """
 
-    translated = await translator.translate(text=text, src=src, dest=dest)
-    
-    return translated.text
\ No newline at end of file
+    translated = await translation_client.translate(text=text, src=src, dest=dest)
+
+    # Same whitespace whether the text was translated alone or split
+    # out of a batch
+    return translated.text.strip()
+
+
+class TranslationCache:
+    """
+    Description: Translated posts, kept in an in-process LRU in front of
+    the translation table. Entries are keyed by post id, content hash,
+    source and destination language so an edited post never gets a stale
+    translation.
+    """
+
+    def __init__(self, maxsize=512):
+        self.memory = LRUCache(maxsize)
+        self.db_hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.memory.maxsize = app.config['TRANSLATION_CACHE_SIZE']
+
+    @staticmethod
+    def key(post, dest):
+        return (post.id, post.content_hash(), post.language or '', dest)
+
+    def get(self, post, dest):
+        """
+        Description: Look up the translation of a post
+        Param: post - Post to be translated
+        Param: dest - Language code of destination text
+        Return: Tuple of translated title and body, or None on a miss
+        """
+
+        key = self.key(post, dest)
+        translation = self.memory.get(key)
+        if translation is not None:
+            return translation
+
+        post_id, content_hash, src, dest = key
+        row = db.session.scalar(
+            sa.select(Translation).where(
+                Translation.post_id == post_id,
+                Translation.content_hash == content_hash,
+                Translation.src == src,
+                Translation.dest == dest))
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        translation = (row.title, row.body)
+        self.memory.set(key, translation)
+        return translation
+
+    def get_many(self, posts, dest):
+        """
+        Description: Look up the translations of several posts with at
+        most one database query
+        Param: posts - Posts to be translated
+        Param: dest - Language code of destination text
+        Return: Dictionary of post id to tuple of translated title and body
+        """
+
+        found = {}
+        missing = {}
+        for post in posts:
+            key = self.key(post, dest)
+            translation = self.memory.get(key)
+            if translation is not None:
+                found[post.id] = translation
+            else:
+                missing[post.id] = key
+        if not missing:
+            return found
+
+        rows = db.session.scalars(
+            sa.select(Translation).where(
+                Translation.post_id.in_(missing),
+                Translation.dest == dest))
+        for row in rows:
+            key = (row.post_id, row.content_hash, row.src, row.dest)
+            if missing.get(row.post_id) == key:
+                del missing[row.post_id]
+                self.db_hits += 1
+                found[row.post_id] = (row.title, row.body)
+                self.memory.set(key, found[row.post_id])
+        self.misses += len(missing)
+        return found
+
+    def set(self, post, dest, title, body, commit=True):
+        """
+        Description: Store the translation of a post, replacing any
+        translation of an older version of the post
+        Param: post - Translated post
+        Param: dest - Language code of destination text
+        Param: title - Translated title
+        Param: body - Translated body
+        Param: commit - Commit the session, False to batch several posts
+        Return: Tuple of translated title and body
+        """
+
+        key = self.key(post, dest)
+        post_id, content_hash, src, dest = key
+        db.session.execute(
+            sa.delete(Translation).where(
+                Translation.post_id == post_id,
+                Translation.content_hash != content_hash,
+                Translation.src == src,
+                Translation.dest == dest))
+        # A request and a translation worker can store the same
+        # translation at once, the second one overwrites the first
+        values = {'post_id': post_id, 'content_hash': content_hash,
+                  'src': src, 'dest': dest, 'title': title, 'body': body}
+        insert = upsert_insert(db.engine.dialect.name)
+        if insert is not None:
+            statement = insert(Translation).values(values)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['post_id', 'content_hash', 'src', 'dest'],
+                set_={'title': statement.excluded.title,
+                      'body': statement.excluded.body,
+                      'timestamp': statement.excluded.timestamp}))
+        else:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(Translation(**values))
+            except IntegrityError:
+                # Stored by the other one in the meantime
+                pass
+        if commit:
+            db.session.commit()
+
+        translation = (title, body)
+        self.memory.set(key, translation)
+        return translation
+
+    def stats(self):
+        return {
+            'memory_hits': self.memory.hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'memory_entries': len(self.memory),
+        }
+
+
+translation_cache = TranslationCache()
+
+
+async def translate_pair(title, body, src, dest):
+    # Run both translations concurrently
+    return await asyncio.gather(
+        translate_text(text=title, src=src, dest=dest),
+        translate_text(text=body, src=src, dest=dest)
+    )
+
+
+def translate_post(post, dest):
+    """
+    Description: Translate the title and body of a post, using the
+    translation cache when the post was translated before
+    Param: post - Post to be translated
+    Param: dest - Language code of destination text
+    Return: Tuple of translated title and body
+    """
+
+    translation = translation_cache.get(post, dest)
+    if translation is not None:
+        return translation
+
+    src = post.language or 'auto'
+
+    translated_title, translated_body = translation_client.run(
+        translate_pair(post.title, post.body, src, dest))
+
+    return translation_cache.set(post, dest, translated_title, translated_body)
+
+
+def pretranslate_post(post):
+    """
+    Description: Translate a post into every configured language other
+    than its own
+    Param: post - Post to be translated
+    """
+
+    for dest in current_app.config['LANGUAGES']:
+        if dest != post.language:
+            translate_post(post, dest)
+
+
+# Joins several texts into one upstream request. Google Translate keeps
+# the line on its own, so the translated text can be split again.
+BATCH_SEPARATOR = '\n\n@@@\n\n'
+
+
+def pack_texts(texts, max_chars):
+    """
+    Description: Pack texts into as few batches as possible
+    Param: texts - Texts to be translated
+    Param: max_chars - Maximum size of one joined batch
+    Return: List of lists of texts
+    """
+
+    batches = []
+    batch = []
+    size = 0
+    for text in texts:
+        added = len(text) + len(BATCH_SEPARATOR)
+        if batch and size + added > max_chars:
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(text)
+        size += added
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def translate_batch(texts, src, dest):
+    # Translate a batch in one request, falling back to one request per
+    # text if the separators did not survive the translation
+    if len(texts) > 1:
+        joined = await translate_text(text=BATCH_SEPARATOR.join(texts),
+                                      src=src, dest=dest)
+        parts = [part.strip() for part in joined.split('@@@')]
+        if len(parts) == len(texts):
+            return parts
+    return await asyncio.gather(
+        *[translate_text(text=text, src=src, dest=dest) for text in texts])
+
+
+async def translate_batches(batches, src, dest):
+    results = await asyncio.gather(
+        *[translate_batch(batch, src, dest) for batch in batches])
+    return [text for result in results for text in result]
+
+
+def translate_many(post_ids, dest):
+    """
+    Description: Translate several posts with as few upstream requests as
+    possible. Identical strings are translated once.
+    Param: post_ids - Ids of the posts to be translated
+    Param: dest - Language code of destination text
+    Return: List of tuples of translated title and body in the order of
+    post_ids, None for posts that do not exist
+    """
+
+    posts = {post.id: post for post in db.session.scalars(
+        sa.select(Post).where(Post.id.in_(post_ids)))}
+    translations = translation_cache.get_many(posts.values(), dest)
+
+    # Group untranslated posts by source language, one group per request
+    groups = {}
+    for post in posts.values():
+        if post.id not in translations:
+            groups.setdefault(post.language or 'auto', []).append(post)
+
+    max_chars = current_app.config['TRANSLATION_BATCH_CHARS']
+    for src, group in groups.items():
+        texts = list(dict.fromkeys(
+            text for post in group for text in (post.title or '', post.body)))
+        translated = translation_client.run(
+            translate_batches(pack_texts(texts, max_chars), src, dest))
+        lookup = dict(zip(texts, translated))
+        for post in group:
+            translations[post.id] = translation_cache.set(
+                post, dest, lookup[post.title or ''], lookup[post.body],
+                commit=False)
+    db.session.commit()
+
+    return [translations.get(post_id) for post_id in post_ids]
@@ -0,0 +1,285 @@
+"""
+Program: Transfer
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Streaming import and export of users and posts as NDJSON or
+CSV. Imports insert in batches and can be restarted from a checkpoint,
+exports keep a constant amount of memory.
+
+Revisions:
+
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from itertools import islice
+from flask import current_app
+from app.extensions import db
+from app.models import Post, User, email_digest, timeline_enabled
+from app.text import prepare_post
+
+USER_FIELDS = ('username', 'firstname', 'lastname', 'email', 'password',
+               'about_me', 'last_seen')
+POST_FIELDS = ('id', 'author', 'title', 'body', 'timestamp', 'language')
+
+
+def file_format(path, format=None):
+    # 'ndjson' or 'csv', from the option or else the file extension
+    if format:
+        return format
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def read_records(f, format):
+    if format == 'csv':
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordWriter:
+    """
+    Description: Writes dictionaries as NDJSON lines or CSV rows
+    """
+
+    def __init__(self, f, format, fields):
+        self.f = f
+        self.csv = None
+        if format == 'csv':
+            self.csv = csv.DictWriter(f, fieldnames=fields)
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.csv is not None:
+            self.csv.writerow(record)
+        else:
+            self.f.write(json.dumps(record) + '\n')
+
+
+def parse_time(value):
+    # Naive UTC datetime from an ISO timestamp, None when missing
+    if not value:
+        return None
+    value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class Checkpoint:
+    """
+    Description: Number of records of a source file already imported,
+    kept next to it so an interrupted import continues where it stopped
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('source') != self.source:
+            return 0
+        return data.get('done', 0)
+
+    def save(self, done):
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': self.source, 'done': done}, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def batches(records, size):
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_records(path, format, batch_size, checkpoint, insert_batch, progress=None):
+    """
+    Description: Stream the records of a file into insert_batch, one
+    commit per batch, saving the checkpoint after each commit
+    Param: path - NDJSON or CSV file
+    Param: format - 'ndjson' or 'csv'
+    Param: batch_size - Records per batch
+    Param: checkpoint - Checkpoint of the file, None to start over
+    Param: insert_batch - Function inserting a list of records, returning
+    the number inserted
+    Param: progress - Optional function called with the records done
+    Return: Tuple of records read and rows inserted
+    """
+
+    done = checkpoint.load() if checkpoint else 0
+    inserted = 0
+    with open(path, newline='', encoding='utf-8') as f:
+        records = islice(read_records(f, format), done, None)
+        for batch in batches(records, batch_size):
+            try:
+                inserted += insert_batch(batch)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            done += len(batch)
+            if checkpoint:
+                checkpoint.save(done)
+            if progress:
+                progress(done)
+    if checkpoint:
+        checkpoint.clear()
+    return done, inserted
+
+
+def insert_users(batch):
+    # Users whose username or email is taken are skipped
+    usernames = [record['username'] for record in batch]
+    emails = [record['email'] for record in batch]
+    taken = set(db.session.scalars(
+        sa.select(User.username).where(User.username.in_(usernames))))
+    taken.update(db.session.scalars(
+        sa.select(User.email).where(User.email.in_(emails))))
+    rows = []
+    for record in batch:
+        if record['username'] in taken or record['email'] in taken:
+            continue
+        taken.update((record['username'], record['email']))
+        rows.append({
+            'username': record['username'],
+            'firstname': record.get('firstname') or None,
+            'lastname': record.get('lastname') or None,
+            'email': record['email'],
+            'avatar_hash': email_digest(record['email']),
+            # Exported password hashes keep working
+            'password': record.get('password') or None,
+            'about_me': record.get('about_me') or None,
+            'last_seen': parse_time(record.get('last_seen')),
+        })
+    if rows:
+        db.session.execute(sa.insert(User), rows)
+    return len(rows)
+
+
+class PostImporter:
+    """
+    Description: Sanitizes and detects the language of post records in a
+    process pool and inserts them in batches
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.tags = current_app.config['ALLOWED_TAGS']
+        self.attributes = current_app.config['ALLOWED_ATTRIBUTES']
+        self.authors = {}
+        self.skipped = 0
+
+    def author_ids(self, usernames):
+        missing = set(usernames) - self.authors.keys()
+        if missing:
+            self.authors.update(db.session.execute(
+                sa.select(User.username, User.id).where(User.username.in_(missing))).all())
+        return self.authors
+
+    def __call__(self, batch):
+        jobs = [(record, self.tags, self.attributes) for record in batch]
+        if self.pool is not None:
+            records = self.pool.map(prepare_post, jobs)
+        else:
+            records = [prepare_post(job) for job in jobs]
+
+        authors = self.author_ids(record['author'] for record in records)
+        rows = []
+        for record in records:
+            user_id = authors.get(record['author'])
+            if user_id is None:
+                self.skipped += 1
+                continue
+            rows.append({
+                'user_id': user_id,
+                'title': record.get('title') or None,
+                'body': record['body'],
+                'language': record['language'],
+                'timestamp': (parse_time(record.get('timestamp')) or
+                              datetime.now(timezone.utc)),
+            })
+        if rows:
+            db.session.execute(sa.insert(Post), rows)
+        return len(rows)
+
+
+def import_posts(path, format, batch_size, checkpoint, workers, progress=None):
+    """
+    Description: Import posts, see import_records. Posts of unknown
+    authors are skipped. Timelines are rebuilt in fanout mode.
+    Param: workers - Processes for sanitizing and language detection, 0
+    to do it in this process
+    Return: Tuple of records read, rows inserted and records skipped
+    """
+
+    pool = None
+    if workers:
+        pool = multiprocessing.get_context('spawn').Pool(workers)
+    try:
+        importer = PostImporter(pool)
+        done, inserted = import_records(path, format, batch_size, checkpoint,
+                                        importer, progress)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    if inserted and timeline_enabled():
+        Post.rebuild_timelines()
+        db.session.commit()
+    return done, inserted, importer.skipped
+
+
+def export_rows(path, format, fields, query, batch_size):
+    """
+    Description: Write the rows of a query to a file, fetching batch_size
+    rows at a time from a server side cursor
+    Return: Number of rows written
+    """
+
+    total = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = RecordWriter(f, format, fields)
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            record = dict(row._mapping)
+            for name, value in record.items():
+                if isinstance(value, datetime):
+                    record[name] = value.isoformat()
+            writer.write(record)
+            total += 1
+    return total
+
+
+def export_users(path, format, batch_size):
+    query = sa.select(*[getattr(User, field) for field in USER_FIELDS]).order_by(User.id)
+    return export_rows(path, format, USER_FIELDS, query, batch_size)
+
+
+def export_posts(path, format, batch_size):
+    query = (sa.select(Post.id, User.username.label('author'), Post.title,
+                       Post.body, Post.timestamp, Post.language)
+             .join(Post.author)
+             .order_by(Post.id))
+    return export_rows(path, format, POST_FIELDS, query, batch_size)
@@ -0,0 +1,250 @@
+"""
+Program: Hot Routes
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Benchmark of the busiest pages. Seeds a SQLite database,
+drives the routes through the Flask test client with the stub translator
+and the SMTP stub, and writes latency percentiles, queries per request
+and throughput as JSON.
+
+Usage:
+python benchmarks/hot_routes.py --users 200 --posts 5000 --follows 20
+python benchmarks/hot_routes.py --output after.json --compare before.json
+
+Revisions:
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from statistics import mean, quantiles
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'benchmark-password'
+
+WORDS = ('flask', 'python', 'journal', 'template', 'database', 'query',
+         'cache', 'route', 'session', 'login', 'babel', 'deploy', 'server',
+         'request', 'response', 'index', 'search', 'profile', 'entry', 'test')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def configure(work_dir, smtp_port):
+    # Settings are read when the app package is imported
+    os.environ.update({
+        'SECRET_KEY': 'benchmark',
+        'DEV_DATABASE_URL': 'sqlite:///' + os.path.join(work_dir, 'bench.db'),
+        'TRANSLATOR_BACKEND': 'stub',
+        'TRANSLATION_WORKERS': '0',
+        'PASSWORD_HASH_WORKERS': '0',
+        'MAIL_SERVER': 'localhost',
+        'MAIL_PORT': str(smtp_port),
+        'MAIL_DEFAULT_SENDER': 'journal@example.com',
+        'MAIL_ADMIN': 'admin@example.com',
+        'LOG_FILE': os.path.join(work_dir, 'journal.log'),
+    })
+
+
+def seed(rng, users, posts, follows):
+    """
+    Description: Fill an empty database with users, posts and follower
+    edges in bulk
+    Param: rng - random.Random used for all choices
+    Param: users - Number of users
+    Param: posts - Number of posts
+    Param: follows - Number of users each user follows
+    """
+
+    import sqlalchemy as sa
+    from werkzeug.security import generate_password_hash
+    from app.extensions import db
+    from app.models import Post, User, email_digest, followers, timeline_enabled
+
+    password = generate_password_hash(PASSWORD)
+    db.session.execute(sa.insert(User), [
+        {'id': number, 'username': f'user{number}', 'firstname': 'Bench',
+         'lastname': f'User {number}', 'email': f'user{number}@example.com',
+         'avatar_hash': email_digest(f'user{number}@example.com'),
+         'password': password, 'about_me': ' '.join(rng.choices(WORDS, k=12))}
+        for number in range(1, users + 1)])
+
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    db.session.execute(sa.insert(Post), [
+        {'id': number, 'user_id': rng.randint(1, users),
+         'title': ' '.join(rng.choices(WORDS, k=4)).title(),
+         'body': ' '.join(rng.choices(WORDS, k=rng.randint(20, 120))),
+         'language': rng.choice(('en', 'de')),
+         'timestamp': start + timedelta(minutes=number)}
+        for number in range(1, posts + 1)])
+
+    edges = [{'follower_id': follower, 'followed_id': followed}
+             for follower in range(1, users + 1)
+             for followed in rng.sample(range(1, users + 1), min(follows, users))
+             if followed != follower]
+    db.session.execute(followers.insert(), edges)
+    db.session.commit()
+
+    User.repair_follow_counts()
+    if timeline_enabled():
+        Post.rebuild_timelines()
+    db.session.commit()
+
+
+def routes(rng, users, posts):
+    # Name, logged in, url factory for each benchmarked route
+    def username():
+        return f'user{rng.randint(1, users)}'
+
+    return [
+        ('index', False, lambda: '/'),
+        ('index_logged_in', True, lambda: '/'),
+        ('user', True, lambda: '/user/user1'),
+        ('search', False, lambda: f'/search/?searched={rng.choice(WORDS)}'),
+        ('profile_popup', False, lambda: f'/profile_popup/{username()}'),
+        ('trans_text', True, lambda: f'/trans_text/{rng.randint(1, posts)}'),
+    ]
+
+
+def queries_of(response):
+    # Statement count from the Server-Timing header of the pages blueprint
+    match = re.search(r'desc="(\d+) queries"', response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+def summarize(latencies, queries, elapsed, errors):
+    cuts = quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'mean_ms': round(mean(latencies), 3),
+        'queries_per_request': round(mean(queries), 2) if queries else None,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+    }
+
+
+def run_route(client, url, requests, warmup):
+    for _ in range(warmup):
+        client.get(url())
+    latencies = []
+    queries = []
+    errors = 0
+    start = perf_counter()
+    for _ in range(requests):
+        path = url()
+        began = perf_counter()
+        response = client.get(path)
+        latencies.append((perf_counter() - began) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+        count = queries_of(response)
+        if count is not None:
+            queries.append(count)
+    return summarize(latencies, queries, perf_counter() - start, errors)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    # Percent change of p50, p95 and queries against an earlier run
+    lines = []
+    for name, result in results['routes'].items():
+        before = baseline.get('routes', {}).get(name)
+        if before is None:
+            continue
+        changes = []
+        for field in ('p50_ms', 'p95_ms', 'queries_per_request'):
+            if before.get(field) and result.get(field) is not None:
+                change = (result[field] - before[field]) / before[field] * 100
+                changes.append(f'{field} {change:+.1f}%')
+        lines.append(f'{name}: ' + ', '.join(changes))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the busiest pages')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--follows', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--routes', nargs='+', help='Only run these routes')
+    parser.add_argument('--output', help='Write the JSON results to a file')
+    parser.add_argument('--compare', help='JSON results of an earlier run')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix='journal-bench-')
+    configure(work_dir, free_port())
+
+    from app import create_app
+    from app.smtp_stub import SMTPStub
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(WTF_CSRF_ENABLED=False)
+    smtp = SMTPStub(port=app.config['MAIL_PORT']).start()
+    with app.app_context():
+        db.create_all()
+        seed(rng, args.users, args.posts, args.follows)
+
+    anonymous = app.test_client()
+    logged_in = app.test_client()
+    logged_in.post('/login/', data={'username': 'user1', 'password': PASSWORD})
+
+    results = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'time': datetime.now(timezone.utc).isoformat(),
+        'parameters': {name: value for name, value in vars(args).items()
+                       if name not in ('output', 'compare')},
+        'routes': {},
+    }
+    for name, login, url in routes(rng, args.users, args.posts):
+        if args.routes and name not in args.routes:
+            continue
+        client = logged_in if login else anonymous
+        results['routes'][name] = run_route(client, url, args.requests, args.warmup)
+    results['mail_received'] = len(smtp.messages)
+    smtp.shutdown()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(results, baseline)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Program: Login Throughput
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Measures logins per second with concurrent request threads,
+hashing inline and in the password hashing pool
+
+Usage: python benchmarks/login_throughput.py [--threads 8] [--logins 64]
+
+Revisions:
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'benchmark-password'
+
+
+def create_benchmark_app(users):
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ['DEV_DATABASE_URL'] = 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(), 'login.db')
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import User
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False,
+                      PASSWORD_HASH_WORKERS=0)
+    with app.app_context():
+        db.create_all()
+        for number in range(users):
+            user = User(username=f'user{number}', firstname='Bench',
+                        lastname='Mark', email=f'user{number}@example.com')
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def run(app, workers, threads, logins):
+    from app.passwords import password_hasher
+
+    app.config['PASSWORD_HASH_WORKERS'] = workers
+    password_hasher.init_app(app)
+    # Start the pool processes before timing
+    password_hasher.verify(password_hasher.hash(PASSWORD), PASSWORD)
+
+    def login(number):
+        with app.test_client() as client:
+            response = client.post('/login/', data={
+                'username': f'user{number % threads}', 'password': PASSWORD})
+            return response.status_code
+
+    start = perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        statuses = list(executor.map(login, range(logins)))
+    elapsed = perf_counter() - start
+    password_hasher.shutdown()
+
+    return {
+        'workers': workers,
+        'threads': threads,
+        'logins': logins,
+        'failed': sum(status != 302 for status in statuses),
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(logins / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[0, os.cpu_count() or 1])
+    args = parser.parse_args()
+    app = create_benchmark_app(args.threads)
+    results = [run(app, workers, args.threads, args.logins)
+               for workers in args.workers]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
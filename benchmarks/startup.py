@@ -0,0 +1,128 @@
+"""
+Program: Startup
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Benchmark of cold start. Times importing the app package,
+creating the app and flask --help in fresh interpreters, as a worker
+spawn would, and writes the results as JSON.
+
+Usage:
+python benchmarks/startup.py --runs 10
+python benchmarks/startup.py --output after.json --compare before.json
+
+Revisions:
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from statistics import median
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Name and command of each timed stage
+STAGES = (
+    ('interpreter', [sys.executable, '-c', 'pass']),
+    ('import_app', [sys.executable, '-c', 'import app']),
+    ('create_app', [sys.executable, '-c', 'from app import create_app; create_app()']),
+    ('flask_help', [sys.executable, '-m', 'flask', '--help']),
+)
+
+
+def environment(work_dir):
+    # Settings are read when the app package is imported
+    env = dict(os.environ)
+    env.update({
+        'SECRET_KEY': 'benchmark',
+        'DEV_DATABASE_URL': 'sqlite:///' + os.path.join(work_dir, 'bench.db'),
+        'LOG_FILE': os.path.join(work_dir, 'journal.log'),
+        'FLASK_APP': 'app:create_app',
+        'PYTHONPATH': ROOT,
+    })
+    return env
+
+
+def time_stage(command, runs, env):
+    # Wall times in ms of runs of the command, after one unmeasured run
+    subprocess.run(command, cwd=ROOT, env=env, capture_output=True, check=True)
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, capture_output=True, check=True)
+        times.append((perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(median(times), 1),
+        'min_ms': round(min(times), 1),
+        'max_ms': round(max(times), 1),
+    }
+
+
+def lazy_modules_loaded(env):
+    # Lazily loaded packages imported by create_app anyway
+    code = ('import sys; from app import create_app; create_app(); '
+            'from app.startup import LAZY_MODULES; '
+            'print(" ".join(m for m in LAZY_MODULES if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    # Percent change of the median of each stage against an earlier run
+    lines = []
+    for name, result in results['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if before and before.get('median_ms'):
+            change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+            lines.append(f'{name}: median_ms {change:+.1f}%')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='Write the JSON results to a file')
+    parser.add_argument('--compare', help='JSON results of an earlier run')
+    args = parser.parse_args()
+
+    env = environment(tempfile.mkdtemp(prefix='journal-bench-'))
+    results = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'time': datetime.now(timezone.utc).isoformat(),
+        'parameters': {'runs': args.runs},
+        'stages': {name: time_stage(command, args.runs, env)
+                   for name, command in STAGES},
+        'lazy_modules_loaded': lazy_modules_loaded(env),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(results, baseline)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
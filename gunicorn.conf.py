@@ -0,0 +1,54 @@
+"""
+Program: Gunicorn Config
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Gunicorn settings for the production entry point in wsgi.py.
+The app is loaded in the master and forked into the workers.
+
+Run app:
+gunicorn -c gunicorn.conf.py
+GUNICORN_PROFILE=large gunicorn -c gunicorn.conf.py
+
+Revisions:
+
+"""
+
+import os
+
+cpus = os.cpu_count() or 1
+
+# Worker processes and threads per worker. Translation and mail wait on
+# the network, so threads serve most pages, processes add CPU for
+# templates. Every worker also runs TRANSLATION_WORKERS and POST_WORKERS
+# job threads, keep threads plus those below the database pool size
+# (SQLAlchemy default 5 plus 10 overflow).
+PROFILES = {
+    'small': (2, 4),
+    'medium': (cpus + 1, 4),
+    'large': (cpus * 2 + 1, 8),
+}
+
+profile = os.environ.get('GUNICORN_PROFILE') or 'medium'
+default_workers, default_threads = PROFILES[profile]
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND') or '127.0.0.1:8000'
+preload_app = True
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY') or default_workers)
+threads = int(os.environ.get('GUNICORN_THREADS') or default_threads)
+
+# Seconds for a request, for in-flight requests on restart, and to keep
+# idle client connections
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 30)
+graceful_timeout = 30
+keepalive = 5
+
+# Replace workers now and then, so a slow leak cannot grow unbounded
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS') or 5000)
+max_requests_jitter = max_requests // 10
+
+# The app writes its own access log with request ids and timings
+accesslog = None
+errorlog = '-'
@@ -0,0 +1,116 @@
+"""
+Program: Test Fixtures
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Shared pytest fixtures. The app runs on a temporary SQLite
+database with the stub translator and without background workers, so
+every statement of a request runs in the request.
+
+Revisions:
+10/18/2026 Move the shared values to helpers.py
+
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+import pytest
+import sqlalchemy as sa
+
+# Settings are read when the app package is imported
+work_dir = tempfile.mkdtemp(prefix='journal-test-')
+os.environ.update({
+    'SECRET_KEY': 'test',
+    'DEV_DATABASE_URL': 'sqlite:///' + os.path.join(work_dir, 'test.db'),
+    'LOG_FILE': os.path.join(work_dir, 'journal.log'),
+    'TRANSLATOR_BACKEND': 'stub',
+    'TRANSLATION_WORKERS': '0',
+    'POST_WORKERS': '0',
+    'PASSWORD_HASH_WORKERS': '0',
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'FRAGMENT_CACHE': 'none',
+    'PAGE_CACHE_SIZE': '0',
+    'LAST_SEEN_INTERVAL': '3600',
+})
+
+from app import create_app
+from app.activity import last_seen_tracker
+from app.extensions import db
+from app.models import Post, User, email_digest, followers
+from tests.helpers import PASSWORD, WORDS
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture
+def database(app):
+    # Empty tables for every test
+    with app.app_context():
+        db.create_all()
+        yield db
+        # Write buffered last seen times while the tables exist
+        last_seen_tracker.flush()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def seeded(database):
+    """
+    Description: Ten users who each follow the next three, and 60 posts
+    Return: The first user, who is logged in by the client fixture
+    """
+
+    database.session.execute(sa.insert(User), [
+        {'id': number, 'username': f'user{number}', 'firstname': 'Test',
+         'lastname': f'User {number}', 'email': f'user{number}@example.com',
+         'avatar_hash': email_digest(f'user{number}@example.com'),
+         'password': None}
+        for number in range(1, 11)])
+    start = datetime.now(timezone.utc) - timedelta(days=60)
+    database.session.execute(sa.insert(Post), [
+        {'id': number, 'user_id': number % 10 + 1,
+         'title': f'{WORDS[number % 10]} entry {number}'.title(),
+         'body': ' '.join(WORDS[(number + i) % 10] for i in range(20)),
+         'language': 'en', 'timestamp': start + timedelta(hours=number)}
+        for number in range(1, 61)])
+    database.session.execute(followers.insert(), [
+        {'follower_id': follower, 'followed_id': (follower + step - 1) % 10 + 1}
+        for follower in range(1, 11) for step in range(1, 4)])
+    for each in database.session.scalars(sa.select(User)):
+        each.set_password(PASSWORD)
+    User.repair_follow_counts()
+    database.session.commit()
+    return database.session.get(User, 1)
+
+
+@pytest.fixture
+def client(app, seeded):
+    # Logged in as the first seeded user
+    client = app.test_client()
+    client.post('/login/', data={'username': seeded.username,
+                                 'password': PASSWORD})
+    return client
+
+
+@pytest.fixture
+def statements(database):
+    """
+    Description: Record the SQL statements run while the test runs
+    Return: List of statements, cleared by the test when needed
+    """
+
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    sa.event.listen(database.engine, 'before_cursor_execute', record)
+    yield recorded
+    sa.event.remove(database.engine, 'before_cursor_execute', record)
@@ -0,0 +1,16 @@
+"""
+Program: Test Helpers
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Values shared by the fixtures and the tests. Kept out of
+conftest.py, which pytest imports itself and tests should not import.
+
+Revisions:
+
+"""
+
+PASSWORD = 'test-password'
+
+WORDS = ('flask', 'python', 'journal', 'template', 'database', 'query',
+         'cache', 'route', 'session', 'login')
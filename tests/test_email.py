@@ -0,0 +1,115 @@
+"""
+Program: Test Email
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Mail dispatcher and error digests, sent through the local
+SMTP stub
+
+Revisions:
+
+"""
+
+import logging
+import socket
+import time
+import pytest
+from flask_mail import Message
+from app.email import DigestMailHandler, mail_dispatcher
+from app.smtp_stub import SMTPStub
+
+SENDER = 'journal@example.com'
+REFUSED = 'nobody@example.com'
+
+
+@pytest.fixture
+def smtp(app, monkeypatch):
+    """
+    Description: SMTP stub the mail extension sends to, with a short idle
+    timeout so the dispatcher lets go of it after each test
+    Return: Started SMTPStub
+    """
+
+    stub = SMTPStub(refused=[REFUSED]).start()
+    state = app.extensions['mail']
+    monkeypatch.setattr(state, 'server', 'localhost')
+    monkeypatch.setattr(state, 'port', stub.port)
+    monkeypatch.setattr(state, 'default_sender', SENDER)
+    # TESTING turns sending off
+    monkeypatch.setattr(state, 'suppress', False)
+    monkeypatch.setattr(mail_dispatcher, 'idle_timeout', 0.2)
+    yield stub
+    mail_dispatcher.join()
+    wait_for(lambda: mail_dispatcher._connection is None)
+    stub.shutdown()
+    stub.server_close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def send(app, count, recipient='reader@example.com'):
+    with app.app_context():
+        for number in range(count):
+            assert mail_dispatcher.submit(Message(
+                f'Mail {number}', recipients=[recipient], body='Hello'))
+    mail_dispatcher.join()
+
+
+def test_mail_shares_one_connection(app, smtp):
+    sent = mail_dispatcher.sent
+    send(app, 5)
+    assert len(smtp.messages) == 5
+    assert smtp.connections == 1
+    assert mail_dispatcher.sent == sent + 5
+
+
+def test_reconnects_when_server_drops_connection(app, smtp):
+    send(app, 1)
+    # The server goes away while the connection is idle
+    mail_dispatcher._connection.host.sock.shutdown(socket.SHUT_RDWR)
+    failed = mail_dispatcher.failed
+    send(app, 1)
+    assert len(smtp.messages) == 2
+    assert smtp.connections == 2
+    assert mail_dispatcher.failed == failed
+
+
+def test_refused_recipient_is_not_retried(app, smtp):
+    failed = mail_dispatcher.failed
+    start = time.monotonic()
+    send(app, 1, recipient=REFUSED)
+    # No reconnect and no backoff sleep for an error that will not improve
+    assert time.monotonic() - start < 1
+    assert mail_dispatcher.failed == failed + 1
+    assert smtp.connections == 1
+    send(app, 1)
+    assert len(smtp.messages) == 1
+
+
+def test_repeated_errors_are_sent_as_one_digest(app, smtp):
+    handler = DigestMailHandler(app, 'admin@example.com', interval=0.3)
+    logger = logging.getLogger('journal.test_digest')
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        # The first error is mailed at once, the next ones wait for the interval
+        logger.error('Database is gone')
+        for _ in range(3):
+            logger.error('Template failed')
+        logger.error('Database is gone')
+        wait_for(lambda: len(smtp.messages) == 2)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    mail_dispatcher.join()
+
+    first, digest = [data for sender, recipients, data in smtp.messages]
+    assert 'Subject: Flask Journal Failure\n' in first.replace('\r', '')
+    assert 'Subject: Flask Journal Failure (4 errors)' in digest
+    assert '3 times, first:' in digest
+    assert len(smtp.messages) == 2
@@ -0,0 +1,45 @@
+"""
+Program: Test HTTP Cache
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Anonymous pages are validated by their ETag only
+
+Revisions:
+
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.extensions import db
+
+PAGES = ('/index/', '/profile/user1', '/about/')
+
+
+@pytest.mark.parametrize('url', PAGES)
+def test_etag_answers_not_modified(app, seeded, url):
+    client = app.test_client()
+    response = client.get(url)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response.headers
+    etag = response.headers['ETag']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('url', PAGES)
+def test_modified_since_alone_renders_page(app, seeded, url):
+    # A date cannot tell whether a profile or a deploy changed the page
+    since = datetime.now(timezone.utc) + timedelta(days=1)
+    response = app.test_client().get(url, headers={
+        'If-Modified-Since': since.strftime('%a, %d %b %Y %H:%M:%S GMT')})
+    assert response.status_code == 200
+
+
+def test_profile_change_changes_etag(app, seeded):
+    client = app.test_client()
+    etag = client.get('/profile/user1').headers['ETag']
+    seeded.about_me = 'Changed'
+    db.session.commit()
+    response = client.get('/profile/user1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
@@ -0,0 +1,152 @@
+"""
+Program: Test Jobs
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Background job queues, run synchronously. The tests call
+the worker loop body themselves instead of starting worker threads.
+
+Revisions:
+
+"""
+
+import pytest
+import sqlalchemy as sa
+from queue import Queue
+from app import jobs
+from app.jobs import JobQueue, post_jobs, process_post, translation_jobs
+from app.models import Post, Translation
+
+BODY = ('Today I wrote a small web application and spent the evening '
+        'reading about how databases keep their indexes up to date.')
+
+
+class FlakyJobs(JobQueue):
+    # Raises on its first runs, then succeeds
+    name = 'flaky'
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.runs = []
+
+    def process(self, post_id):
+        self.runs.append(post_id)
+        if len(self.runs) <= self.failures:
+            raise RuntimeError('Upstream unavailable')
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    # Backoff sleeps, recorded instead of slept
+    slept = []
+    monkeypatch.setattr(jobs.time, 'sleep', slept.append)
+    return slept
+
+
+def stopped(queue, monkeypatch, size=1):
+    """
+    Description: Give a queue workers that never start and an empty
+    backlog of the given size
+    Return: The queue
+    """
+
+    monkeypatch.setattr(queue, 'workers', 1)
+    monkeypatch.setattr(queue, '_start', lambda: None)
+    monkeypatch.setattr(queue, '_queue', Queue(maxsize=size))
+    return queue
+
+
+def flaky(app, failures):
+    queue = FlakyJobs(failures)
+    queue.app = app
+    queue.retries = 3
+    queue.backoff = 0.5
+    return queue
+
+
+def test_retries_with_exponential_backoff(app, delays):
+    queue = flaky(app, failures=2)
+    queue._run(7)
+    assert queue.runs == [7, 7, 7]
+    assert delays == [0.5, 1.0]
+    assert (queue.completed, queue.failed) == (1, 0)
+
+
+def test_gives_up_after_retries(app, delays):
+    queue = flaky(app, failures=10)
+    queue._run(7)
+    assert len(queue.runs) == 4
+    assert delays == [0.5, 1.0, 2.0]
+    assert (queue.completed, queue.failed) == (0, 1)
+
+
+def test_disabled_queue_does_not_take_jobs(app):
+    queue = flaky(app, failures=0)
+    assert not queue.submit(7)
+    assert queue.stats()['submitted'] == 0
+
+
+def test_full_backlog_drops_job(app, monkeypatch):
+    queue = stopped(translation_jobs, monkeypatch)
+    dropped = queue.dropped
+    assert queue.submit(1)
+    assert not queue.submit(2)
+    assert queue.dropped == dropped + 1
+    assert queue.stats()['backlog'] == 1
+
+
+def test_translation_job_stores_translations(seeded, database, monkeypatch):
+    queue = stopped(translation_jobs, monkeypatch)
+    assert queue.submit(1)
+    queue._run(queue._queue.get_nowait())
+    dests = database.session.scalars(
+        sa.select(Translation.dest).where(Translation.post_id == 1)).all()
+    # Seeded posts are English, LANGUAGES is en and de
+    assert dests == ['de']
+
+
+def new_post(database, user):
+    # Stored as add_entry stores it, before the post job has run
+    post = Post(title='Evening', body=BODY, user_id=user.id)
+    database.session.add(post)
+    database.session.commit()
+    return post.id
+
+
+def test_process_post_detects_language_and_translates(seeded, database,
+                                                      monkeypatch):
+    queue = stopped(translation_jobs, monkeypatch)
+    post_id = new_post(database, seeded)
+    process_post(post_id)
+    assert database.session.get(Post, post_id).language == 'en'
+
+    # The translation is queued, not made in the post job
+    assert queue._queue.get_nowait() == post_id
+    queue._run(post_id)
+    translation = database.session.scalar(
+        sa.select(Translation).where(Translation.post_id == post_id))
+    assert (translation.src, translation.dest) == ('en', 'de')
+    assert translation.body.startswith('[de]')
+
+
+def test_process_post_runs_once(seeded, database, monkeypatch):
+    queue = stopped(translation_jobs, monkeypatch, size=2)
+    post_id = new_post(database, seeded)
+    process_post(post_id)
+    process_post(post_id)
+    assert queue.stats()['backlog'] == 1
+
+
+def test_full_post_backlog_processes_entry_inline(client, database,
+                                                  monkeypatch):
+    queue = stopped(post_jobs, monkeypatch)
+    queue._queue.put_nowait(0)
+    dropped = queue.dropped
+    response = client.post('/add_entry/', data={'title': 'Evening',
+                                                'post': BODY})
+    assert response.status_code == 302
+    assert queue.dropped == dropped + 1
+    post = database.session.scalar(
+        sa.select(Post).where(Post.title == 'Evening'))
+    assert post.language == 'en'
@@ -0,0 +1,37 @@
+"""
+Program: Test Listing Writes
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Rendering a listing only reads. Post bodies are marked safe
+in the template rather than changed on the Post instances.
+
+Revisions:
+
+"""
+
+import pytest
+
+PAGES = ('/index/', '/user/user1', '/search/?searched=flask')
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def assert_read_only(client, database, statements, url):
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    writes = [statement for statement in statements
+              if statement.lstrip().upper().startswith(WRITES)]
+    assert writes == []
+    # The requests share the app context, and with it the session
+    assert not database.session.dirty
+
+
+@pytest.mark.parametrize('url', PAGES)
+def test_listing_does_not_write(client, database, statements, url):
+    assert_read_only(client, database, statements, url)
+
+
+def test_anonymous_index_does_not_write(app, seeded, database, statements):
+    assert_read_only(app.test_client(), database, statements, '/index/')
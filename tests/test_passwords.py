@@ -0,0 +1,42 @@
+"""
+Program: Test Passwords
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: A saturated password hashing pool answers 503 with
+Retry-After instead of failing the request
+
+Revisions:
+10/18/2026 Import the password from helpers.py
+
+"""
+
+import pytest
+from app.passwords import password_hasher
+from tests.helpers import PASSWORD
+
+
+def busy(*args):
+    raise TimeoutError('Password hashing pool is busy')
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    monkeypatch.setattr(password_hasher, 'hash', busy)
+    monkeypatch.setattr(password_hasher, 'verify', busy)
+
+
+def test_login_when_busy(app, seeded, saturated):
+    response = app.test_client().post(
+        '/login/', data={'username': seeded.username, 'password': PASSWORD})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+
+
+def test_signup_when_busy(app, seeded, saturated):
+    response = app.test_client().post('/signup/', data={
+        'firstname': 'New', 'lastname': 'User',
+        'username': 'newuser', 'email': 'newuser@example.com',
+        'password': PASSWORD, 'password2': PASSWORD})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
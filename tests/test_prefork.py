@@ -0,0 +1,43 @@
+"""
+Program: Test Prefork
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: A forked worker starts without the buffered state, threads
+and pools of the master
+
+Revisions:
+
+"""
+
+import os
+import pytest
+from app.activity import last_seen_tracker
+from app.prefork import after_fork
+from app.trans import translation_client
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_after_fork_resets_worker_state(app, seeded):
+    # A user no other test has logged in, so the time is buffered
+    user_id = 10
+    last_seen_tracker.touch(user_id)
+    translation_client._start()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: reset as a forking server would, report through the pipe
+        try:
+            after_fork(app)
+            ok = (not last_seen_tracker._pending and
+                  not last_seen_tracker._lock.locked() and
+                  translation_client._loop is None)
+            os.write(write, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.close(write)
+    result = os.read(read, 1)
+    os.waitpid(pid, 0)
+    assert result == b'1'
+    # The parent keeps its buffered times
+    assert user_id in last_seen_tracker._pending
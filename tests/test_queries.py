@@ -0,0 +1,54 @@
+"""
+Program: Test Queries
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: The listing pages load posts with their authors, so the
+number of queries of a page does not grow with the posts on it
+
+Revisions:
+
+"""
+
+import pytest
+import sqlalchemy as sa
+from app.models import User
+
+# Page and its queries for a logged in user whose principal is cached:
+# the posts with their authors, plus the profile user on /user and the
+# count of matches on /search
+PAGES = (
+    ('/index/', 1),
+    ('/user/user1', 2),
+    ('/search/?searched=flask', 2),
+)
+
+
+def queries_of(app, client, statements, monkeypatch, url, per_page):
+    # Statements of a second request, after caches of the first are warm
+    monkeypatch.setitem(app.config, 'POSTS_PER_PAGE', per_page)
+    client.get(url)
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('url, expected', PAGES)
+def test_queries_do_not_grow_with_page_size(app, client, statements,
+                                            monkeypatch, url, expected):
+    counts = [queries_of(app, client, statements, monkeypatch, url, per_page)
+              for per_page in (3, 10)]
+    assert counts == [expected, expected]
+
+
+@pytest.mark.parametrize('url, expected', PAGES)
+def test_avatars_without_digest_do_not_add_queries(app, client, database,
+                                                   statements, monkeypatch,
+                                                   url, expected):
+    # Users created before the avatar digest column fall back to the email
+    database.session.execute(sa.update(User).values(avatar_hash=None))
+    database.session.commit()
+    counts = [queries_of(app, client, statements, monkeypatch, url, per_page)
+              for per_page in (3, 10)]
+    assert counts == [expected, expected]
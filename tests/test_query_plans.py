@@ -0,0 +1,59 @@
+"""
+Program: Test Query Plans
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: The hot queries are answered from their composite and
+expression indexes, and no query of the main pages scans a whole table
+
+Revisions:
+
+"""
+
+import pytest
+import sqlalchemy as sa
+from app.models import Post, User
+from app.query_plans import capture_statements, check_query_plans, sqlite_plan
+
+# Name, query of the seeded user, and the index its plan must use
+HOT_QUERIES = (
+    ('posts of a user',
+     lambda user: sa.select(Post).where(Post.user_id == user.id)
+     .order_by(Post.timestamp.desc()).limit(3),
+     'ix_post_user_id_timestamp'),
+    ('followed posts',
+     lambda user: user.following_posts().limit(3),
+     'ix_post_user_id_timestamp'),
+    ('followers of a user',
+     lambda user: user.followers.select(),
+     'ix_followers_followed_id_follower_id'),
+    ('signup username check',
+     lambda user: sa.select(User).where(User.username_taken('USER1')),
+     'ix_user_username_lower'),
+)
+
+
+def plan_of(database, query):
+    # Plan lines of every statement the query runs
+    statements = capture_statements(
+        lambda: database.session.execute(query).all())
+    lines = []
+    with database.engine.connect() as connection:
+        for statement, parameters in statements:
+            plan, scans = sqlite_plan(connection, statement, parameters)
+            assert scans == []
+            lines.extend(plan)
+    return lines
+
+
+@pytest.mark.parametrize('name, query, index', HOT_QUERIES,
+                         ids=[name for name, query, index in HOT_QUERIES])
+def test_hot_query_uses_index(seeded, database, name, query, index):
+    plan = plan_of(database, query(seeded))
+    assert any(f'INDEX {index} ' in line for line in plan), plan
+
+
+def test_pages_do_not_scan_tables(seeded, database):
+    results = check_query_plans()
+    assert results
+    assert [result for result in results if result['full_scans']] == []
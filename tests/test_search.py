@@ -0,0 +1,31 @@
+"""
+Program: Test Search
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Search of databases created before the full-text index
+
+Revisions:
+
+"""
+
+import sqlalchemy as sa
+from app import search
+
+
+def test_search_without_index_scans_posts(client, database, monkeypatch):
+    # A database from before the index, flask search reindex not yet run
+    for trigger in ('insert', 'delete', 'update'):
+        database.session.execute(sa.text(f'DROP TRIGGER post_fts_{trigger}'))
+    database.session.execute(sa.text('DROP TABLE post_fts'))
+    database.session.commit()
+    monkeypatch.setattr(search, 'indexed', set())
+
+    response = client.get('/search/?searched=flask')
+    assert response.status_code == 200
+    assert b'Flask Entry' in response.data
+
+    search.create_search_index()
+    response = client.get('/search/?searched=flask')
+    assert response.status_code == 200
+    assert b'Flask Entry' in response.data
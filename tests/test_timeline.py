@@ -0,0 +1,60 @@
+"""
+Program: Test Timeline
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Fan-out timelines when a follow backfill and the post job
+both add the same post
+
+Revisions:
+
+"""
+
+import pytest
+import sqlalchemy as sa
+from app.jobs import process_post
+from app.models import Post, User, followers, timeline
+
+
+@pytest.fixture
+def fanout(app, seeded, monkeypatch):
+    monkeypatch.setitem(app.config, 'TIMELINE_MODE', 'fanout')
+    Post.rebuild_timelines()
+    return seeded
+
+
+def timeline_of(database, user):
+    return database.session.scalars(
+        sa.select(timeline.c.post_id).where(timeline.c.user_id == user.id)
+        .order_by(timeline.c.post_id)).all()
+
+
+def test_follow_backfill_then_post_job(fanout, database):
+    author = database.session.get(User, 9)
+    # Stored by add_entry, the post job has not run yet
+    post = Post(title='Late', body='A post waiting for its language',
+                user_id=author.id)
+    database.session.add(post)
+    database.session.commit()
+
+    fanout.follow(author)
+    database.session.commit()
+    process_post(post.id)
+
+    assert timeline_of(database, fanout).count(post.id) == 1
+    assert timeline_of(database, author).count(post.id) == 1
+
+
+def test_follow_twice_backfills_once(fanout, database):
+    author = database.session.get(User, 9)
+    fanout.follow(author)
+    database.session.commit()
+    before = timeline_of(database, fanout)
+    # A follow row lost while its timeline entries stayed behind
+    database.session.execute(followers.delete().where(
+        followers.c.follower_id == fanout.id,
+        followers.c.followed_id == author.id))
+    database.session.commit()
+    fanout.follow(author)
+    database.session.commit()
+    assert timeline_of(database, fanout) == before
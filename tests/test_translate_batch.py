@@ -0,0 +1,23 @@
+"""
+Program: Test Translate Batch
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: A text comes back the same whether it was translated in a
+batch or on its own
+
+Revisions:
+
+"""
+
+from app.trans import translate_batch, translation_client
+
+TEXTS = ['  Flask journal entry  \n', 'Second entry\n\nwith two paragraphs\n']
+
+
+def test_batch_and_single_translations_match(app):
+    batched = translation_client.run(translate_batch(TEXTS, 'en', 'de'))
+    single = [translation_client.run(translate_batch([text], 'en', 'de'))[0]
+              for text in TEXTS]
+    assert batched == single
+    assert all(text == text.strip() for text in batched)
@@ -0,0 +1,44 @@
+"""
+Program: Test Translation Cache
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Storing a translation that another request or worker has
+stored in the meantime updates it instead of failing
+
+Revisions:
+
+"""
+
+import sqlalchemy as sa
+from app.models import Post, Translation
+from app.trans import translation_cache
+
+
+def test_set_overwrites_translation_stored_meanwhile(seeded, database):
+    post = database.session.get(Post, 1)
+    post_id, content_hash, src, dest = translation_cache.key(post, 'de')
+    # Committed by a translation worker after this request missed the cache
+    with database.engine.begin() as connection:
+        connection.execute(sa.insert(Translation).values(
+            post_id=post_id, content_hash=content_hash, src=src, dest=dest,
+            title='Worker title', body='Worker body'))
+
+    translation_cache.set(post, 'de', 'Request title', 'Request body')
+
+    rows = database.session.scalars(
+        sa.select(Translation).where(Translation.post_id == post_id)).all()
+    assert [(row.title, row.body) for row in rows] == [('Request title', 'Request body')]
+
+
+def test_set_replaces_translation_of_older_version(seeded, database):
+    post = database.session.get(Post, 1)
+    translation_cache.set(post, 'de', 'Old title', 'Old body')
+    post.body = post.body + ' edited'
+    database.session.commit()
+    translation_cache.set(post, 'de', 'New title', 'New body')
+
+    rows = database.session.scalars(
+        sa.select(Translation).where(Translation.post_id == post.id)).all()
+    assert len(rows) == 1
+    assert rows[0].content_hash == post.content_hash()
@@ -0,0 +1,20 @@
+"""
+Program: WSGI
+Author: Maya Name
+Creation Date: 10/18/2026
+Revision Date:
+Description: Production entry point. The app is created and warmed up
+once, forked workers reset the connections and threads they inherit.
+
+Run app:
+gunicorn -c gunicorn.conf.py
+
+Revisions:
+
+"""
+
+from app import create_app
+from app.prefork import prepare_for_fork
+
+app = create_app()
+prepare_for_fork(app)